@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from .sd import SDEntry, DiskInfo, SDInterface
+from .sd import SDEntry, DirListing, DiskInfo, SDInterface, SDPreempted, SyncResult, TransferCancelled
+from .sd_index import SDIndex
 from .modbus import ModbusInterface
 from .ef import EFInterface
 from .user_ram import UserRAMInterface
 from .connection import LabJackDevice
+from .aio import AsyncLabJackDevice, AsyncSDInterface
+from .pool import DevicePool
+from .scheduler import DeviceScheduler, ScheduledLJM
+from .instrument import InstrumentedLJM, LJMStats, format_stats
+from .backend import load_backend
 
 # Backwards-compatible alias
 LabJackSD = LabJackDevice
@@ -12,10 +18,24 @@ LabJackSD = LabJackDevice
 __all__ = [
     "LabJackDevice",
     "LabJackSD",
+    "AsyncLabJackDevice",
+    "AsyncSDInterface",
+    "DevicePool",
     "SDEntry",
+    "DirListing",
     "DiskInfo",
     "SDInterface",
+    "SDPreempted",
+    "SyncResult",
+    "TransferCancelled",
+    "SDIndex",
     "ModbusInterface",
     "EFInterface",
     "UserRAMInterface",
+    "DeviceScheduler",
+    "ScheduledLJM",
+    "InstrumentedLJM",
+    "LJMStats",
+    "format_stats",
+    "load_backend",
 ]
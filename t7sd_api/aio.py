@@ -0,0 +1,271 @@
+# t7sd_api/aio.py
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Optional
+import asyncio
+import functools
+import threading
+
+from .connection import LabJackDevice
+
+_DONE = object()
+
+
+class SDIteration:
+    """
+    Streaming SD iterator (iter_file_chunks, iter_dir, walk). It holds the
+    device's SD lock from the first item until it is closed, so it must be
+    used as an async context manager:
+
+        async with dev.sd.iter_dir("/") as entries:
+            async for entry in entries:
+                ...
+
+    Leaving the block closes it (file closed, cwd restored, lock released)
+    even if the loop stopped early. Iterating outside `async with` raises
+    RuntimeError instead of leaving the lock held until garbage collection.
+    """
+
+    def __init__(self, agen: AsyncIterator[Any]):
+        self._agen = agen
+        self._entered = False
+
+    async def __aenter__(self) -> "SDIteration":
+        self._entered = True
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    def __aiter__(self) -> "SDIteration":
+        return self
+
+    async def __anext__(self) -> Any:
+        if not self._entered:
+            raise RuntimeError(
+                "SD iterators hold the SD lock; use 'async with dev.sd.<iter>(...) as it:'"
+            )
+        return await self._agen.__anext__()
+
+    async def aclose(self):
+        await self._agen.aclose()
+
+
+class _AsyncInterface:
+    """
+    Awaitable view of a synchronous sub-interface (modbus, ef, user_ram):
+    every method call runs on one of the owning device's executors.
+    """
+
+    def __init__(
+        self, owner: "AsyncLabJackDevice", target: Any, executor: Optional[ThreadPoolExecutor] = None
+    ):
+        self._owner = owner
+        self._target = target
+        self._executor = executor or owner._executor
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._target, attr)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        async def call(*args, **kwargs):
+            return await self._owner._run_on(self._executor, value, *args, **kwargs)
+
+        return call
+
+
+class AsyncSDInterface(_AsyncInterface):
+    """
+    Awaitable SDInterface. SD calls are additionally serialized by an asyncio
+    lock, so a streaming read in one task is never interleaved with another
+    task's SD call between chunks (FILE_IO is one state machine per device).
+    """
+
+    def __init__(self, owner: "AsyncLabJackDevice", target: Any):
+        super().__init__(owner, target)
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _sd_lock(self) -> asyncio.Lock:
+        # Created lazily so it binds to the running loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def __getattr__(self, attr: str):
+        call = super().__getattr__(attr)
+        if not asyncio.iscoroutinefunction(call):
+            return call
+
+        @functools.wraps(call)
+        async def locked(*args, **kwargs):
+            async with self._sd_lock():
+                return await call(*args, **kwargs)
+
+        return locked
+
+    async def _iterate(self, make_gen: Callable[[], Any]) -> AsyncIterator[Any]:
+        """
+        Drive a synchronous SD generator on the executor, one item per job.
+        However iteration ends (exhausted, break, exception or task
+        cancellation) the generator is closed on the executor thread, which
+        closes any open file and restores the cwd before the lock is released.
+        """
+        async with self._sd_lock():
+            gen = make_gen()
+            try:
+                while True:
+                    item = await self._owner._run(next, gen, _DONE)
+                    if item is _DONE:
+                        return
+                    yield item
+            finally:
+                # Shielded: a second cancellation must not skip the cleanup
+                await asyncio.shield(self._owner._run(gen.close))
+
+    def iter_file_chunks(
+        self, sd_path: str, chunk_size: Optional[int] = None, offset: int = 0
+    ) -> SDIteration:
+        return SDIteration(self._iterate(
+            lambda: self._target.iter_file_chunks(sd_path, chunk_size, offset)
+        ))
+
+    def iter_dir(self, path: Optional[str] = None) -> SDIteration:
+        return SDIteration(self._iterate(lambda: self._target.iter_dir(path)))
+
+    def walk(self, top: Optional[str] = None, **kwargs) -> SDIteration:
+        return SDIteration(self._iterate(lambda: self._target.walk(top, **kwargs)))
+
+    async def download_to(
+        self, sd_path: str, fileobj: Any, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Stream a file into fileobj chunk by chunk; cancellable between chunks.
+        """
+        written = 0
+        async with self.iter_file_chunks(sd_path, chunk_size) as chunks:
+            async for chunk in chunks:
+                fileobj.write(chunk)
+                written += len(chunk)
+        return written
+
+    async def download_file(
+        self,
+        sd_path: str,
+        local_path: str,
+        resume: bool = False,
+        part_path: Optional[str] = None,
+    ) -> int:
+        """
+        Resumable download (see SDInterface.download_file). Cancelling the
+        awaiting task stops the transfer at the next chunk and waits for the
+        device to be left clean before re-raising CancelledError; the .part
+        file is kept for a later resume=True.
+        """
+        cancel = threading.Event()
+        async with self._sd_lock():
+            job = asyncio.ensure_future(self._owner._run(
+                self._target.download_file, sd_path, local_path, resume, part_path, cancel
+            ))
+            try:
+                return await asyncio.shield(job)
+            except asyncio.CancelledError:
+                cancel.set()
+                try:
+                    await asyncio.shield(job)
+                except Exception:
+                    # TransferCancelled (or a late device error): nothing to report
+                    pass
+                raise
+
+
+class AsyncLabJackDevice:
+    """
+    asyncio facade over LabJackDevice.
+
+    Every LJM call for this device runs on its own single-thread executor, so
+    calls are serialized per device (and FILE_IO is never interleaved) while
+    any number of devices make progress concurrently on the event loop.
+
+    If the device has a scheduler (connect() enables one by default), register
+    calls get a second thread of their own: the scheduler then serves them
+    between the FILE_IO_READ chunks of a long SD transfer instead of queueing
+    them behind the whole job.
+    """
+
+    def __init__(self, device: LabJackDevice, executor: Optional[ThreadPoolExecutor] = None):
+        self.device = device
+        name = getattr(device, "identifier", device.handle)
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"t7sd-{name}"
+        )
+        self._register_executor = self._executor
+        if getattr(device, "scheduler", None) is not None:
+            self._register_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"t7sd-{name}-reg"
+            )
+
+        # Subsystems
+        self.sd = AsyncSDInterface(self, device.sd)
+        self.modbus = _AsyncInterface(self, device.modbus, self._register_executor)
+        self.ef = _AsyncInterface(self, device.ef, self._register_executor)
+        self.user_ram = _AsyncInterface(self, device.user_ram, self._register_executor)
+
+    @classmethod
+    async def connect(cls, identifier: str = "ANY", **kwargs) -> "AsyncLabJackDevice":
+        """
+        Open a device without blocking the loop. kwargs are passed to
+        LabJackDevice.connect (device_type, connection, backend, index, ...);
+        schedule defaults to True here.
+        """
+        kwargs.setdefault("schedule", True)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"t7sd-{identifier}")
+        loop = asyncio.get_running_loop()
+        try:
+            device = await loop.run_in_executor(
+                executor, functools.partial(LabJackDevice.connect, identifier, **kwargs)
+            )
+        except BaseException:
+            executor.shutdown(wait=False)
+            raise
+        return cls(device, executor)
+
+    async def _run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await self._run_on(self._executor, fn, *args, **kwargs)
+
+    async def _run_on(
+        self, executor: ThreadPoolExecutor, fn: Callable[..., Any], *args, **kwargs
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+    @property
+    def identifier(self) -> Optional[str]:
+        return getattr(self.device, "identifier", None)
+
+    def stats(self):
+        return self.device.stats()
+
+    def reset_stats(self):
+        self.device.reset_stats()
+
+    async def close(self):
+        """
+        Close the device after any queued calls, then stop the executors.
+        """
+        try:
+            if self._register_executor is not self._executor:
+                # Drain queued register calls before the handle goes away
+                await self._run_on(self._register_executor, lambda: None)
+            await self._run(self.device.close)
+        finally:
+            self._executor.shutdown(wait=False)
+            self._register_executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncLabJackDevice":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
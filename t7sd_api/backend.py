@@ -0,0 +1,80 @@
+# t7sd_api/backend.py
+
+from __future__ import annotations
+from typing import Any
+import ctypes
+
+try:
+    from labjack import ljm
+except ImportError:
+    # LJM is not installed; only non-hardware backends (e.g. "sim") are usable.
+    ljm = None
+
+
+def load_backend(backend: Any = "ljm", **options) -> Any:
+    """
+    Resolve a backend spec into an object exposing the `labjack.ljm` functions
+    used by this package.
+
+    "ljm" is the real LJM library, "sim" the in-process T7 simulator
+    (options are passed to SimulatedLJM). Any other object is assumed to
+    already be ljm-like and is returned unchanged.
+    """
+    if backend == "ljm":
+        if ljm is None:
+            raise RuntimeError(
+                "labjack-ljm is not installed; install it or use backend='sim'."
+            )
+        return ljm
+
+    if backend == "sim":
+        from .sim import SimulatedLJM, default_simulator
+
+        return SimulatedLJM(**options) if options else default_simulator()
+
+    if isinstance(backend, str):
+        raise ValueError(f"Unknown backend '{backend}' (expected 'ljm' or 'sim').")
+    return backend
+
+
+def read_name_byte_array_into(lj: Any, handle: int, name: str, buffer) -> int:
+    """
+    Fill buffer (a writable bytearray/memoryview) from byte-array register
+    `name`, reading len(buffer) bytes without building a Python list of ints.
+
+    Backends may provide eReadNameByteArrayInto natively (the simulator and
+    InstrumentedLJM do); for the real LJM library the C function is called
+    directly on the buffer. Anything else falls back to eReadNameByteArray.
+    Returns the number of bytes read.
+    """
+    view = memoryview(buffer).cast("B")
+    num_bytes = len(view)
+    if num_bytes == 0:
+        return 0
+
+    native = getattr(lj, "eReadNameByteArrayInto", None)
+    if native is not None:
+        native(handle, name, view)
+        return num_bytes
+
+    static_lib = getattr(getattr(lj, "ljm", None), "_staticLib", None)
+    if static_lib is not None:
+        c_bytes = (ctypes.c_char * num_bytes).from_buffer(view)
+        error_address = ctypes.c_int32(-1)
+        try:
+            error = static_lib.LJM_eReadNameByteArray(
+                ctypes.c_int32(handle),
+                name.encode("ascii"),
+                ctypes.c_int32(num_bytes),
+                ctypes.byref(c_bytes),
+                ctypes.byref(error_address),
+            )
+        finally:
+            # Release the export so the caller's bytearray can be resized again
+            del c_bytes
+        if error != 0:
+            raise lj.LJMError(error, error_address.value)
+        return num_bytes
+
+    view[:] = bytes(lj.eReadNameByteArray(handle, name, num_bytes))
+    return num_bytes
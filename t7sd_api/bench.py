@@ -0,0 +1,409 @@
+# t7sd_api/bench.py
+
+"""
+Performance benchmarks for the SD, Modbus, USER_RAM and batch paths.
+
+Runs against the in-process simulator (t7sd_api.sim) so no hardware is needed,
+and prints one JSON document with round trips, wall time, throughput and peak
+memory per case. The coalesce suite checks that batch output is the same with
+and without register coalescing (exit status 1 if not):
+
+    python -m t7sd_api.bench --latency 0.002 --output bench.json
+"""
+
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .connection import LabJackDevice
+from .sim import SimulatedLJM
+
+DEVICE = "192.168.1.4"
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reset the process's RSS high-water mark so the next reading covers only
+    what runs after this (Linux only: writing 5 to clear_refs resets VmHWM).
+    ru_maxrss can't be used: it is the lifetime peak and never goes down.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _make_sim(args) -> SimulatedLJM:
+    return SimulatedLJM(latency=args.latency, bandwidth=args.bandwidth)
+
+
+def _connect(sim: SimulatedLJM) -> LabJackDevice:
+    return LabJackDevice.connect(DEVICE, backend=sim, instrument=True)
+
+
+def _close(dev: LabJackDevice):
+    # close() announces itself on stdout, which carries the JSON report
+    with contextlib.redirect_stdout(io.StringIO()):
+        dev.close()
+
+
+def _measure(
+    name: str,
+    dev: Optional[LabJackDevice],
+    fn: Callable[[], Any],
+    trace_memory: bool,
+    params: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Run fn once and report timing, round trips and memory.
+    fn returns (bytes_moved, operations) so throughput can be derived.
+    """
+    if dev is not None:
+        dev.reset_stats()
+    if trace_memory:
+        tracemalloc.start()
+    rss_tracked = _reset_peak_rss()
+
+    start = time.perf_counter()
+    nbytes, ops = fn()
+    wall = time.perf_counter() - start
+
+    py_peak = None
+    if trace_memory:
+        py_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    round_trips = dev.stats()["round_trips"] if dev is not None else None
+
+    return {
+        "name": name,
+        "params": params,
+        "wall_s": wall,
+        "round_trips": round_trips,
+        "bytes": nbytes,
+        "ops": ops,
+        "bytes_per_s": nbytes / wall if wall and nbytes else None,
+        "ops_per_s": ops / wall if wall and ops else None,
+        # Per-case peak where the platform can reset it, else not reported
+        "peak_rss_bytes": _peak_rss_bytes() if rss_tracked else None,
+        "py_peak_bytes": py_peak,
+    }
+
+
+# ------------------ cases ------------------ #
+
+def bench_list_dir(args) -> List[Dict[str, Any]]:
+    results = []
+    for count in args.dir_sizes:
+        sim = _make_sim(args)
+        device = sim.add_device(DEVICE, populate=False)
+        for i in range(count):
+            device.add_file(f"/BIG/{i:06d}.csv", b"x" * (i % 97))
+        dev = _connect(sim)
+
+        for batched in (True, False):
+            dev.sd.batched_dir_reads = batched
+
+            def run():
+                entries = dev.sd.list_dir("/BIG")
+                return 0, len(entries)
+
+            results.append(_measure(
+                "sd.list_dir", dev, run, args.trace_memory,
+                {"entries": count, "batched": batched},
+            ))
+        _close(dev)
+    return results
+
+
+def bench_read_file(args) -> List[Dict[str, Any]]:
+    results = []
+    for size in args.file_sizes:
+        sim = _make_sim(args)
+        device = sim.add_device(DEVICE, populate=False)
+        device.add_file("/DATA.bin", os.urandom(size))
+        dev = _connect(sim)
+
+        def read_all():
+            return len(dev.sd.read_file_bytes("/DATA.bin")), 1
+
+        def stream():
+            with tempfile.TemporaryFile() as f:
+                return dev.sd.download_to("/DATA.bin", f), 1
+
+        results.append(_measure("sd.read_file_bytes", dev, read_all, args.trace_memory,
+                                {"file_bytes": size}))
+        results.append(_measure("sd.download_to", dev, stream, args.trace_memory,
+                                {"file_bytes": size}))
+        _close(dev)
+    return results
+
+
+def bench_modbus(args) -> List[Dict[str, Any]]:
+    sim = _make_sim(args)
+    dev = _connect(sim)
+    n = args.iterations
+
+    def reads():
+        for _ in range(n):
+            dev.modbus.read("AIN0")
+        return 0, n
+
+    def writes():
+        for i in range(n):
+            dev.modbus.write("DAC0", (i % 50) / 10.0)
+        return 0, n
+
+    results = [
+        _measure("modbus.read", dev, reads, args.trace_memory, {"iterations": n}),
+        _measure("modbus.write", dev, writes, args.trace_memory, {"iterations": n}),
+    ]
+    _close(dev)
+    return results
+
+
+def bench_user_ram(args) -> List[Dict[str, Any]]:
+    sim = _make_sim(args)
+    dev = _connect(sim)
+    ram = dev.user_ram
+    sweeps = {
+        "F32": (40, ram.read_f32, ram.write_f32),
+        "I32": (10, ram.read_i32, ram.write_i32),
+        "U32": (40, ram.read_u32, ram.write_u32),
+        "U16": (20, ram.read_u16, ram.write_u16),
+    }
+
+    results = []
+    for dtype, (count, read, write) in sweeps.items():
+        def write_sweep():
+            for i in range(count):
+                write(i, i)
+            return 0, count
+
+        def read_sweep():
+            for i in range(count):
+                read(i)
+            return 0, count
+
+        results.append(_measure("user_ram.write_sweep", dev, write_sweep, args.trace_memory,
+                                {"type": dtype, "slots": count}))
+        results.append(_measure("user_ram.read_sweep", dev, read_sweep, args.trace_memory,
+                                {"type": dtype, "slots": count}))
+
+        def read_block():
+            return 0, len(ram.read_block(dtype))
+
+        results.append(_measure("user_ram.read_block", dev, read_block, args.trace_memory,
+                                {"type": dtype, "slots": count}))
+    _close(dev)
+    return results
+
+
+BATCH_COMMANDS = [
+    "pwd",
+    "ls",
+    "info",
+    "read AIN0",
+    "write DAC0 2.5",
+    "user-ram-read F32 0",
+]
+
+
+def bench_batch(args) -> List[Dict[str, Any]]:
+    # The batch runner lives in the shell package; import lazily so the API
+    # benchmarks don't depend on it.
+    from concurrent.futures import ThreadPoolExecutor
+    from t7sd_shell.batch import build_registry, run_commands_on_device
+    from t7sd_shell.batch_plan import compile_plan
+
+    registry = build_registry()
+    plan = compile_plan(BATCH_COMMANDS, registry)
+    devices = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(args.devices)]
+
+    results = []
+    for parallel in args.parallel:
+        sim = _make_sim(args)
+        stats: Dict[str, Any] = {}
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                with ThreadPoolExecutor(max_workers=parallel) as pool:
+                    ok = list(pool.map(
+                        lambda ident: run_commands_on_device(
+                            ident, plan, registry, stats_out=stats, backend=sim
+                        ),
+                        devices,
+                    ))
+            return 0, sum(ok) * len(BATCH_COMMANDS)
+
+        params = {"devices": len(devices), "parallel": parallel,
+                  "commands": len(BATCH_COMMANDS)}
+        result = _measure("batch", None, run, args.trace_memory, params)
+        result["round_trips"] = sum(s["round_trips"] for s in stats.values())
+        results.append(result)
+    return results
+
+
+# Register lines the device rejects mid-group (writing an input, an unknown
+# name) next to ones that succeed; registers read are ones that don't drift.
+COALESCE_CHECK_COMMANDS = [
+    "write DAC0 2.5",
+    "read DAC0",
+    "write AIN1 1",
+    "read SERIAL_NUMBER PRODUCT_ID",
+    "user-ram-read F32 0",
+    "pwd",
+    "write DAC1 1.25",
+    "read NOT_A_REGISTER",
+    "read DAC1",
+]
+
+# A merged group failing on its first line must stop there under
+# --stop-on-error, leaving the later lines (and the write) unrun.
+COALESCE_CHECK_STOP_COMMANDS = [
+    "read NOT_A_REGISTER",
+    "read DAC0",
+    "write DAC0 5",
+    "read DAC0",
+]
+
+
+def check_coalesce(args) -> List[Dict[str, Any]]:
+    """
+    Run the coalesce check scripts with and without register coalescing on a
+    fresh simulator each time; the printed output and the registers left on
+    the device must be identical.
+    """
+    from t7sd_shell.batch import build_registry, run_commands_on_device
+    from t7sd_shell.batch_plan import compile_plan
+
+    registry = build_registry()
+    results = []
+    for commands, stop_on_error in (
+        (COALESCE_CHECK_COMMANDS, False),
+        (COALESCE_CHECK_COMMANDS, True),
+        (COALESCE_CHECK_STOP_COMMANDS, True),
+    ):
+        outputs = {}
+        registers = {}
+        for coalesce in (True, False):
+            sim = _make_sim(args)
+            plan = compile_plan(commands, registry, coalesce=coalesce)
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                run_commands_on_device(
+                    DEVICE, plan, registry, stop_on_error=stop_on_error, backend=sim
+                )
+            outputs[coalesce] = out.getvalue().splitlines()
+            registers[coalesce] = dict(sim.devices[DEVICE].registers)
+
+        diff = [
+            {"coalesced": a, "line_by_line": b}
+            for a, b in zip(outputs[True], outputs[False]) if a != b
+        ]
+        if len(outputs[True]) != len(outputs[False]):
+            diff.append({"coalesced": len(outputs[True]), "line_by_line": len(outputs[False])})
+        for name in sorted(set(registers[True]) | set(registers[False])):
+            if registers[True].get(name) != registers[False].get(name):
+                diff.append({
+                    "register": name,
+                    "coalesced": registers[True].get(name),
+                    "line_by_line": registers[False].get(name),
+                })
+        results.append({
+            "name": "batch.coalesce_check",
+            "params": {"commands": len(commands), "stop_on_error": stop_on_error},
+            "identical": not diff,
+            "diff": diff,
+        })
+    return results
+
+
+SUITES = {
+    "list_dir": bench_list_dir,
+    "read_file": bench_read_file,
+    "modbus": bench_modbus,
+    "user_ram": bench_user_ram,
+    "batch": bench_batch,
+    "coalesce": check_coalesce,
+}
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark t7sd_api against the in-process T7 simulator."
+    )
+    parser.add_argument("--suites", default=",".join(SUITES),
+                        help=f"Comma-separated subset of: {', '.join(SUITES)}")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Simulated seconds per device transaction")
+    parser.add_argument("--bandwidth", type=float, default=None,
+                        help="Simulated link bandwidth in bytes/s (default unlimited)")
+    parser.add_argument("--dir-sizes", type=_int_list, default=[10, 100, 1000, 10000])
+    parser.add_argument("--file-sizes", type=_int_list,
+                        default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--iterations", type=int, default=1000,
+                        help="Loop count for modbus read/write")
+    parser.add_argument("--devices", type=int, default=16,
+                        help="Simulated devices for the batch suite")
+    parser.add_argument("--parallel", type=_int_list, default=[1, 4, 16],
+                        help="--parallel values for the batch suite")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also report Python heap peak per case (slower)")
+    parser.add_argument("--output", default=None, help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency_s": args.latency,
+        "bandwidth_bps": args.bandwidth,
+        "results": [],
+    }
+    for suite in args.suites.split(","):
+        if suite not in SUITES:
+            parser.error(f"unknown suite '{suite}'")
+        print(f"running {suite} ...", file=sys.stderr)
+        report["results"].extend(SUITES[suite](args))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    failed = [r["name"] for r in report["results"] if r.get("identical") is False]
+    if failed:
+        print(f"check failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 from __future__ import annotations
-from typing import Tuple
-
-from labjack import ljm
+from typing import Any, Dict, Optional, Tuple
 
+from .backend import ljm, load_backend
+from .instrument import InstrumentedLJM, LJMStats
+from .scheduler import DeviceScheduler, ScheduledLJM
 from .sd import SDInterface
+from .sd_index import SDIndex
 from .modbus import ModbusInterface
 from .ef import EFInterface
 from .user_ram import UserRAMInterface
@@ -14,15 +16,36 @@ class LabJackDevice:
     High-level T7/T7 Pro device wrapper with sub-interfaces.
     """
 
-    def __init__(self, handle: int, info_tuple: Tuple[int, int, int, int, int, int]):
+    def __init__(
+        self,
+        handle: int,
+        info_tuple: Tuple[int, int, int, int, int, int],
+        lj: Any = ljm,
+        instrument: bool = False,
+        index: Optional[SDIndex] = None,
+        schedule: bool = False,
+    ):
         self.handle = handle
         self.info_tuple = info_tuple
 
+        # Optionally route every LJM call through a timing proxy
+        self.ljm_stats = LJMStats() if instrument else None
+        if instrument:
+            lj = InstrumentedLJM(lj, self.ljm_stats)
+
+        # Optionally arbitrate the handle between threads by priority class.
+        # Wraps the timing proxy so stats measure device time, not queueing.
+        self.scheduler = DeviceScheduler() if schedule else None
+        if schedule:
+            lj = ScheduledLJM(lj, self.scheduler)
+        self.ljm = lj
+
         # Subsystems
-        self.sd = SDInterface(handle)
-        self.modbus = ModbusInterface(handle)
+        self.index = index
+        self.sd = SDInterface(handle, max_bytes_per_mb=info_tuple[5], lj=lj, index=index)
+        self.modbus = ModbusInterface(handle, lj=lj, max_bytes_per_mb=info_tuple[5])
         self.ef = EFInterface(self.modbus)
-        self.user_ram = UserRAMInterface(handle)
+        self.user_ram = UserRAMInterface(handle, lj=lj, modbus=self.modbus)
 
     # ---- lifecycle ---- #
 
@@ -33,30 +56,105 @@ class LabJackDevice:
         device_type: str = "T7",
         connection: str = "ANY",
         quiet: bool = True,
+        instrument: bool = False,
+        backend: Any = "ljm",
+        index: Any = None,
+        schedule: bool = False,
     ) -> "LabJackDevice":
-        handle = ljm.openS(device_type, connection, identifier)
-        info = ljm.getHandleInfo(handle)
-
-        if info[0] in (ljm.constants.dtT4, ljm.constants.dtT8):
-            ljm.close(handle)
+        """
+        Open a device. backend is "ljm" (real hardware), "sim" (the in-process
+        simulator) or any ljm-compatible object such as a SimulatedLJM.
+
+        index attaches a persistent SD listing index keyed by the device
+        serial: True uses the default directory (~/.t7sd/index), a string
+        names another directory, an SDIndex is used as-is, and None/False
+        disables it.
+
+        schedule=True routes every LJM call through a per-device priority
+        scheduler (see t7sd_api.scheduler), so register polls from other
+        threads are served between the chunks of a long SD transfer.
+        """
+        lj = load_backend(backend)
+        handle = lj.openS(device_type, connection, identifier)
+        info = lj.getHandleInfo(handle)
+
+        if info[0] in (lj.constants.dtT4, lj.constants.dtT8):
+            lj.close(handle)
             raise RuntimeError(f"T{info[0]} does not support an SD card.")
 
         if not quiet:
-            ip_str = ljm.numberToIP(info[3])
+            ip_str = lj.numberToIP(info[3])
             print(
                 f"Opened LabJack: devType={info[0]}, connType={info[1]}, "
                 f"serial={info[2]}, ip={ip_str}, port={info[4]}, maxBytesPerMB={info[5]}"
             )
 
-        dev = cls(handle, info)
+        sd_index = index if isinstance(index, SDIndex) else None
+        if index and sd_index is None:
+            try:
+                sd_index = SDIndex.for_serial(
+                    info[2], index_dir=index if isinstance(index, str) else None
+                )
+            except Exception as e:
+                # Listings still work without it, just not across sessions
+                print(f"[WARN] SD index unavailable: {e}")
+
+        dev = cls(handle, info, lj=lj, instrument=instrument, index=sd_index, schedule=schedule)
         dev.identifier = identifier
+        dev._open_args = (device_type, connection, identifier)
         return dev
 
+    def reconnect(self):
+        """
+        Re-open the connection in place (same object, sub-interfaces, stats
+        and index), e.g. after a dropped link. The SD cwd is re-queried.
+        """
+        open_args = getattr(self, "_open_args", None)
+        if open_args is None:
+            raise RuntimeError("Device was not opened with connect(); cannot reconnect.")
+
+        # Keep background SD users (e.g. the shell's prefetcher) off the
+        # handle while it is swapped
+        with self.sd.lock:
+            if self.handle is not None:
+                try:
+                    self.ljm.close(self.handle)
+                except Exception:
+                    # The old handle is usually already dead
+                    pass
+                self.handle = None
+
+            handle = self.ljm.openS(*open_args)
+            self.info_tuple = self.ljm.getHandleInfo(handle)
+            self.handle = handle
+            for sub in (self.sd, self.modbus, self.user_ram):
+                sub.handle = handle
+            self.sd.invalidate()
+
     def close(self):
         if self.handle is not None:
-            print(f"\nConnection to {ljm.numberToIP(ljm.getHandleInfo(self.handle)[3])} has closed.")
-            ljm.close(self.handle)
+            print(f"\nConnection to {self.ljm.numberToIP(self.ljm.getHandleInfo(self.handle)[3])} has closed.")
+            self.ljm.close(self.handle)
             self.handle = None
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+            self.sd.index = None
+
+    # ---- instrumentation ---- #
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-register and per-operation call counts, bytes and latency
+        percentiles. Empty unless the device was opened with instrument=True.
+        """
+        if self.ljm_stats is None:
+            return {}
+        return self.ljm_stats.snapshot()
+
+    def reset_stats(self):
+        if self.ljm_stats is not None:
+            self.ljm_stats.reset()
 
     # ---- compatibility helpers (so existing code doesn't break) ---- #
 
@@ -67,12 +165,24 @@ class LabJackDevice:
     def chdir(self, path: str):
         return self.sd.chdir(path)
 
+    def invalidate_cwd(self):
+        return self.sd.invalidate()
+
     def list_dir(self, path: str = None):
         return self.sd.list_dir(path)
 
     def read_file_bytes(self, sd_path: str) -> bytes:
         return self.sd.read_file_bytes(sd_path)
 
+    def download_to(self, sd_path: str, fileobj) -> int:
+        return self.sd.download_to(sd_path, fileobj)
+
+    def download_file(self, sd_path: str, local_path: str, resume: bool = False) -> int:
+        return self.sd.download_file(sd_path, local_path, resume)
+
+    def sync(self, remote_dir: str, local_dir: str):
+        return self.sd.sync(remote_dir, local_dir)
+
     def read_file_text(self, sd_path: str, encoding="utf-8", errors="replace") -> str:
         return self.sd.read_file_text(sd_path, encoding, errors)
 
@@ -89,6 +199,12 @@ class LabJackDevice:
     def write_reg(self, name: str, value: float):
         return self.modbus.write(name, value)
 
+    def read_regs(self, names) -> dict:
+        return self.modbus.read_many(names)
+
+    def write_regs(self, mapping):
+        return self.modbus.write_many(mapping)
+
     # EF
     def configure_thermistor_SH(self, ain: str, A: float, B: float, C: float, D: float):
         return self.ef.configure_thermistor_SH(ain, A, B, C, D)
@@ -96,6 +212,12 @@ class LabJackDevice:
     def read_ef_value(self, ain: str) -> float:
         return self.ef.read_ef_value(ain)
 
+    def configure_thermistors_SH(self, coefficients):
+        return self.ef.configure_thermistors_SH(coefficients)
+
+    def read_ef_values(self, ains) -> dict:
+        return self.ef.read_ef_values(ains)
+
     # USER_RAM
     def read_user_ram_f32(self, index: int) -> float:
         return self.user_ram.read_f32(index)
@@ -120,3 +242,9 @@ class LabJackDevice:
 
     def write_user_ram_u16(self, index: int, value: int):
         return self.user_ram.write_u16(index, value)
+
+    def read_user_ram_block(self, dtype: str, start: int = 0, count: int = None):
+        return self.user_ram.read_block(dtype, start, count)
+
+    def write_user_ram_block(self, dtype: str, start: int, values):
+        return self.user_ram.write_block(dtype, start, values)
@@ -1,7 +1,9 @@
 # t7sd_api/ef.py
 
 from __future__ import annotations
+from typing import Dict, Iterable, Mapping, Tuple
 
+from .instrument import operation
 from .modbus import ModbusInterface
 
 
@@ -13,25 +15,60 @@ class EFInterface:
     def __init__(self, modbus: ModbusInterface):
         self.modbus = modbus
 
-    def configure_thermistor_SH(self, ain: str, A: float, B: float, C: float, D: float):
+    @property
+    def ljm(self):
+        return self.modbus.ljm
+
+    @staticmethod
+    def _thermistor_SH_registers(
+        ain: str, A: float, B: float, C: float, D: float
+    ) -> Dict[str, float]:
         prefix = f"{ain}_EF_"
+        return {
+            # Enable SH EF (EF index 50); must precede the CONFIG_* writes
+            prefix + "INDEX": 50,
 
-        # Enable SH EF (EF index 50)
-        self.modbus.write(prefix + "INDEX", 50)
+            # Fixed EF settings (same as your Lua/script)
+            prefix + "CONFIG_A": 1,       # excitation settings
+            prefix + "CONFIG_B": 4,       # differential mode
+            prefix + "CONFIG_D": 5,       # negative channel/divider
+            prefix + "CONFIG_E": 10000,   # pull-up ohms
+            prefix + "CONFIG_F": 10000,   # pull-down ohms
 
-        # Fixed EF settings (same as your Lua/script)
-        self.modbus.write(prefix + "CONFIG_A", 1)      # excitation settings
-        self.modbus.write(prefix + "CONFIG_B", 4)      # differential mode
-        self.modbus.write(prefix + "CONFIG_D", 5)      # negative channel/divider
-        self.modbus.write(prefix + "CONFIG_E", 10000)  # pull-up ohms
-        self.modbus.write(prefix + "CONFIG_F", 10000)  # pull-down ohms
+            # SH coefficients
+            prefix + "CONFIG_G": A,
+            prefix + "CONFIG_H": B,
+            prefix + "CONFIG_I": C,
+            prefix + "CONFIG_J": D,
+        }
 
-        # SH coefficients
-        self.modbus.write(prefix + "CONFIG_G", A)
-        self.modbus.write(prefix + "CONFIG_H", B)
-        self.modbus.write(prefix + "CONFIG_I", C)
-        self.modbus.write(prefix + "CONFIG_J", D)
+    @operation("ef.configure_thermistor_SH")
+    def configure_thermistor_SH(self, ain: str, A: float, B: float, C: float, D: float):
+        self.modbus.write_many(self._thermistor_SH_registers(ain, A, B, C, D))
 
+    @operation("ef.configure_thermistors_SH")
+    def configure_thermistors_SH(
+        self, coefficients: Mapping[str, Tuple[float, float, float, float]]
+    ):
+        """
+        Configure several SH thermistors, {ain: (A, B, C, D)}, with all
+        EF_INDEX/CONFIG_* writes packed into multi-frame transactions.
+        """
+        registers: Dict[str, float] = {}
+        for ain, (A, B, C, D) in coefficients.items():
+            registers.update(self._thermistor_SH_registers(ain, A, B, C, D))
+        self.modbus.write_many(registers)
+
+    @operation("ef.read_ef_value")
     def read_ef_value(self, ain: str) -> float:
         name = f"{ain}_EF_READ_A"
         return self.modbus.read(name)
+
+    @operation("ef.read_ef_values")
+    def read_ef_values(self, ains: Iterable[str]) -> Dict[str, float]:
+        """
+        Read EF_READ_A for several AINs in as few transactions as possible.
+        """
+        ains = list(ains)
+        values = self.modbus.read_many(f"{ain}_EF_READ_A" for ain in ains)
+        return {ain: values[f"{ain}_EF_READ_A"] for ain in ains}
@@ -0,0 +1,276 @@
+# t7sd_api/instrument.py
+
+from __future__ import annotations
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+import functools
+import inspect
+import threading
+import time
+
+# Latency samples kept per register/operation for percentile estimates.
+DEFAULT_MAX_SAMPLES = 4096
+
+# Approximate payload of one numeric register value (most are 32-bit).
+VALUE_BYTES = 4
+
+
+class CallStats:
+    """
+    Call count, bytes moved and latency samples for one register or operation.
+    """
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.calls = 0
+        self.round_trips = 0
+        self.bytes = 0
+        self.total_s = 0.0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def record(self, seconds: float, nbytes: int = 0, round_trips: int = 1):
+        self.calls += 1
+        self.round_trips += round_trips
+        self.bytes += nbytes
+        self.total_s += seconds
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        rank = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[rank]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "round_trips": self.round_trips,
+            "bytes": self.bytes,
+            "total_ms": self.total_s * 1000.0,
+            "p50_ms": self.percentile(50) * 1000.0,
+            "p95_ms": self.percentile(95) * 1000.0,
+            "p99_ms": self.percentile(99) * 1000.0,
+            "max_ms": (max(self.samples) if self.samples else 0.0) * 1000.0,
+        }
+
+
+class _ActiveOperation:
+    def __init__(self):
+        self.round_trips = 0
+        self.bytes = 0
+
+
+class LJMStats:
+    """
+    Thread-safe collector of per-register and per-operation LJM statistics.
+    """
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.registers: Dict[str, CallStats] = {}
+        self.operations: Dict[str, CallStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _active(self) -> List[_ActiveOperation]:
+        if not hasattr(self._local, "ops"):
+            self._local.ops = []
+        return self._local.ops
+
+    def record_call(self, register: str, seconds: float, nbytes: int):
+        with self._lock:
+            stats = self.registers.get(register)
+            if stats is None:
+                stats = self.registers[register] = CallStats(self.max_samples)
+            stats.record(seconds, nbytes)
+        # Attribute the round trip to every operation running on this thread
+        for op in self._active():
+            op.round_trips += 1
+            op.bytes += nbytes
+
+    @contextmanager
+    def operation(self, name: str):
+        """
+        Attribute the LJM calls made inside the block to operation `name`.
+        """
+        op = _ActiveOperation()
+        active = self._active()
+        active.append(op)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            active.remove(op)
+            with self._lock:
+                stats = self.operations.get(name)
+                if stats is None:
+                    stats = self.operations[name] = CallStats(self.max_samples)
+                stats.record(elapsed, op.bytes, op.round_trips)
+
+    def totals(self) -> Dict[str, int]:
+        """
+        Total round trips and bytes across all registers.
+        """
+        with self._lock:
+            return {
+                "round_trips": sum(s.calls for s in self.registers.values()),
+                "bytes": sum(s.bytes for s in self.registers.values()),
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            registers = {k: v.summary() for k, v in self.registers.items()}
+            operations = {k: v.summary() for k, v in self.operations.items()}
+        return {
+            "round_trips": sum(r["calls"] for r in registers.values()),
+            "bytes": sum(r["bytes"] for r in registers.values()),
+            "registers": registers,
+            "operations": operations,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.registers.clear()
+            self.operations.clear()
+
+
+def format_stats(snapshot: Dict[str, Any], limit: Optional[int] = None) -> str:
+    """
+    Render a stats snapshot as two text tables, slowest (by total time) first.
+    """
+    lines = [
+        f"{snapshot.get('round_trips', 0)} round trips, "
+        f"{snapshot.get('bytes', 0)} bytes"
+    ]
+    for title, key in (("OPERATION", "operations"), ("REGISTER", "registers")):
+        rows = sorted(
+            snapshot.get(key, {}).items(), key=lambda kv: kv[1]["total_ms"], reverse=True
+        )
+        if limit is not None:
+            rows = rows[:limit]
+        if not rows:
+            continue
+        lines.append("")
+        lines.append(
+            f"{title:<36} {'calls':>7} {'rtt':>7} {'bytes':>10} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'total ms':>10}"
+        )
+        for name, s in rows:
+            lines.append(
+                f"{name[:36]:<36} {s['calls']:>7} {s['round_trips']:>7} {s['bytes']:>10} "
+                f"{s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['p99_ms']:>8.2f} "
+                f"{s['total_ms']:>10.1f}"
+            )
+    return "\n".join(lines)
+
+
+# ------------------ LJM proxy ------------------ #
+
+def _frames_key(names) -> str:
+    names = list(names)
+    if len(names) == 1:
+        return str(names[0])
+    return f"{names[0]} (+{len(names) - 1})"
+
+
+# function name -> (register key, bytes transferred) extracted from call args
+_DEVICE_CALLS: Dict[str, Callable[..., Any]] = {
+    "eReadName": lambda h, name: (name, VALUE_BYTES),
+    "eWriteName": lambda h, name, value: (name, VALUE_BYTES),
+    "eReadNames": lambda h, n, names: (_frames_key(names), n * VALUE_BYTES),
+    "eWriteNames": lambda h, n, names, values: (_frames_key(names), n * VALUE_BYTES),
+    "eNames": lambda h, n, names, writes, num_values, values: (
+        _frames_key(names), sum(num_values) * VALUE_BYTES
+    ),
+    "eReadNameByteArray": lambda h, name, n: (name, n),
+    "eWriteNameByteArray": lambda h, name, n, values: (name, n),
+    "eReadAddress": lambda h, addr, dtype: (f"@{addr}", VALUE_BYTES),
+    "eWriteAddress": lambda h, addr, dtype, value: (f"@{addr}", VALUE_BYTES),
+    "eReadAddresses": lambda h, n, addrs, dtypes: (
+        _frames_key(f"@{a}" for a in addrs), n * VALUE_BYTES
+    ),
+    "eWriteAddresses": lambda h, n, addrs, dtypes, values: (
+        _frames_key(f"@{a}" for a in addrs), n * VALUE_BYTES
+    ),
+}
+
+
+class InstrumentedLJM:
+    """
+    Stand-in for the `labjack.ljm` module that times every device round trip
+    and records it in an LJMStats. Non-device functions and constants are
+    passed through untouched.
+    """
+
+    def __init__(self, backend: Any, stats: Optional[LJMStats] = None):
+        self._backend = backend
+        self.stats = stats if stats is not None else LJMStats()
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._backend, attr)
+        describe = _DEVICE_CALLS.get(attr)
+        if describe is None:
+            return value
+
+        stats = self.stats
+
+        @functools.wraps(value)
+        def timed(*args):
+            start = time.perf_counter()
+            try:
+                return value(*args)
+            finally:
+                register, nbytes = describe(*args)
+                stats.record_call(register, time.perf_counter() - start, nbytes)
+
+        return timed
+
+    def eReadNameByteArrayInto(self, handle: int, name: str, buffer):
+        """
+        Timed buffer-filling read; works whether or not the wrapped backend
+        provides the call natively.
+        """
+        from .backend import read_name_byte_array_into
+
+        start = time.perf_counter()
+        try:
+            read_name_byte_array_into(self._backend, handle, name, buffer)
+        finally:
+            self.stats.record_call(
+                name, time.perf_counter() - start, memoryview(buffer).nbytes
+            )
+
+
+def operation(name: str):
+    """
+    Method decorator attributing the LJM calls a method makes to operation
+    `name`, when the owning interface's `ljm` is instrumented.
+    """
+
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+
+            @functools.wraps(fn)
+            def gen_wrapper(self, *args, **kwargs):
+                stats = getattr(self.ljm, "stats", None)
+                if stats is None:
+                    yield from fn(self, *args, **kwargs)
+                    return
+                with stats.operation(name):
+                    yield from fn(self, *args, **kwargs)
+
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            stats = getattr(self.ljm, "stats", None)
+            if stats is None:
+                return fn(self, *args, **kwargs)
+            with stats.operation(name):
+                return fn(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,7 +1,17 @@
 # t7sd_api/modbus.py
 
 from __future__ import annotations
-from labjack import ljm
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .backend import ljm
+from .instrument import operation
+
+# maxBytesPerMB for a T7 over Ethernet/WiFi, used when the handle info is unknown.
+DEFAULT_MAX_BYTES_PER_MB = 1040
+
+# Modbus feedback framing used when packing several frames into one packet.
+FEEDBACK_HEADER_BYTES = 10   # MBAP header, function code, transaction overhead
+FEEDBACK_FRAME_BYTES = 4     # per-frame type/address/count
 
 
 class ModbusInterface:
@@ -9,11 +19,132 @@ class ModbusInterface:
     Simple Modbus read/write interface bound to a device handle.
     """
 
-    def __init__(self, handle: int):
+    def __init__(
+        self,
+        handle: int,
+        lj: Any = ljm,
+        max_bytes_per_mb: int = DEFAULT_MAX_BYTES_PER_MB,
+    ):
         self.handle = handle
+        self.ljm = lj
+        self.max_bytes_per_mb = max_bytes_per_mb
+
+        # name -> (address, data type); resolved locally by LJM, so cache forever
+        self._addresses: Dict[str, Tuple[int, int]] = {}
+
+    # ------------------ internal helpers ------------------ #
+
+    def _registers_for(self, data_type: int) -> int:
+        return 1 if data_type == self.ljm.constants.UINT16 else 2
+
+    def _frame_batches(self, data_types: Sequence[int]) -> Iterator[slice]:
+        """
+        Split frames into consecutive slices that each fit in one packet.
+        """
+        budget = self.max_bytes_per_mb - FEEDBACK_HEADER_BYTES
+        start, used = 0, 0
+        for i, data_type in enumerate(data_types):
+            cost = FEEDBACK_FRAME_BYTES + 2 * self._registers_for(data_type)
+            if i > start and used + cost > budget:
+                yield slice(start, i)
+                start, used = i, 0
+            used += cost
+        if start < len(data_types):
+            yield slice(start, len(data_types))
 
+    def resolve(self, names: Iterable[str]) -> Tuple[List[int], List[int]]:
+        """
+        Return (addresses, data_types) for names, using the per-device cache.
+        """
+        names = list(names)
+        missing = [n for n in dict.fromkeys(names) if n not in self._addresses]
+        if missing:
+            addresses, data_types = self.ljm.namesToAddresses(len(missing), missing)
+            for name, address, data_type in zip(missing, addresses, data_types):
+                self._addresses[name] = (int(address), int(data_type))
+        resolved = [self._addresses[n] for n in names]
+        return [a for a, _ in resolved], [t for _, t in resolved]
+
+    # ------------------ public Modbus API ------------------ #
+
+    @operation("modbus.read")
     def read(self, name: str) -> float:
-        return ljm.eReadName(self.handle, name)
+        return self.ljm.eReadName(self.handle, name)
 
+    @operation("modbus.write")
     def write(self, name: str, value: float):
-        ljm.eWriteName(self.handle, name, value)
+        self.ljm.eWriteName(self.handle, name, value)
+
+    @operation("modbus.read_addresses")
+    def read_addresses(
+        self, addresses: Sequence[int], data_types: Sequence[int]
+    ) -> List[float]:
+        """
+        Read many registers by address in as few packets as possible.
+        """
+        values: List[float] = []
+        for batch in self._frame_batches(data_types):
+            addrs, types = list(addresses[batch]), list(data_types[batch])
+            values.extend(self.ljm.eReadAddresses(self.handle, len(addrs), addrs, types))
+        return values
+
+    @operation("modbus.write_addresses")
+    def write_addresses(
+        self,
+        addresses: Sequence[int],
+        data_types: Sequence[int],
+        values: Sequence[float],
+    ):
+        """
+        Write many registers by address in as few packets as possible.
+        """
+        for batch in self._frame_batches(data_types):
+            addrs, types = list(addresses[batch]), list(data_types[batch])
+            self.ljm.eWriteAddresses(
+                self.handle, len(addrs), addrs, types, list(values[batch])
+            )
+
+    @operation("modbus.read_many")
+    def read_many(self, names: Iterable[str]) -> Dict[str, float]:
+        """
+        Read several registers, packed into multi-frame transactions.
+        """
+        names = list(names)
+        addresses, data_types = self.resolve(names)
+        return dict(zip(names, self.read_addresses(addresses, data_types)))
+
+    @operation("modbus.write_many")
+    def write_many(self, mapping: Mapping[str, float]):
+        """
+        Write several registers, packed into multi-frame transactions.
+        Frames are sent in the mapping's order.
+        """
+        names = list(mapping)
+        addresses, data_types = self.resolve(names)
+        self.write_addresses(addresses, data_types, [mapping[n] for n in names])
+
+    @operation("modbus.transact")
+    def transact(self, frames: Sequence[Tuple[str, Optional[float]]]) -> List[Optional[float]]:
+        """
+        Run mixed reads and writes, [(name, None | value), ...], in order and
+        packed into as few multi-frame transactions as possible.
+        Returns the value read for each read frame and None for each write.
+        """
+        frames = list(frames)
+        _, data_types = self.resolve(name for name, _ in frames)
+        read, write = self.ljm.constants.READ, self.ljm.constants.WRITE
+        results: List[Optional[float]] = []
+        for batch in self._frame_batches(data_types):
+            chunk = frames[batch]
+            values = self.ljm.eNames(
+                self.handle,
+                len(chunk),
+                [name for name, _ in chunk],
+                [read if value is None else write for _, value in chunk],
+                [1] * len(chunk),
+                [0 if value is None else value for _, value in chunk],
+            )
+            results.extend(
+                got if value is None else None for (_, value), got in zip(chunk, values)
+            )
+        return results
@@ -0,0 +1,240 @@
+# t7sd_api/pool.py
+
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+import random
+import threading
+import time
+
+from .connection import LabJackDevice
+
+# Close pooled connections unused for this many seconds.
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+# Re-verify a pooled connection before use if it was last confirmed this long ago.
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+# Connection attempts per acquire before the device is put into backoff.
+DEFAULT_CONNECT_ATTEMPTS = 3
+
+# Exponential backoff between attempts: base * 2**n seconds, capped, with jitter.
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 60.0
+
+# Cheap register read to confirm a connection is alive.
+HEALTH_CHECK_REGISTER = "SERIAL_NUMBER"
+
+
+class _PoolEntry:
+    def __init__(self, identifier: str):
+        self.identifier = identifier
+        self.device: Optional[LabJackDevice] = None
+        self.lock = threading.Lock()   # held while checked out
+        self.last_used = 0.0
+        self.last_ok = 0.0             # last successful connect/check/use
+        self.failures = 0              # consecutive failed acquires
+        self.retry_at = 0.0
+        self.last_error: Optional[Exception] = None   # cause of the last failed acquire
+
+
+class DevicePool:
+    """
+    Keeps one open connection per device identifier so repeated jobs reuse
+    warm connections instead of paying openS each time.
+
+    A device is checked out to one user at a time (acquire/release or the
+    device() context manager). Connections idle longer than idle_timeout are
+    closed; ones not confirmed within health_check_interval are checked with
+    a register read before being handed out and reconnected in place if dead.
+    Devices that fail to connect back off exponentially across acquires.
+    """
+
+    def __init__(
+        self,
+        backend: Any = "ljm",
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        connect_attempts: int = DEFAULT_CONNECT_ATTEMPTS,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        **connect_kwargs,
+    ):
+        self.backend = backend
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_attempts = max(1, connect_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.connect_kwargs = connect_kwargs   # passed to LabJackDevice.connect
+
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._lock = threading.Lock()
+
+    # ------------------ checkout ------------------ #
+
+    def acquire(self, identifier: str, timeout: Optional[float] = None) -> LabJackDevice:
+        """
+        Check out a healthy connection to identifier, connecting if needed.
+        Blocks while another thread has it checked out (up to timeout).
+        Raises ConnectionError if the device is backing off or cannot be reached.
+        """
+        self.close_idle()
+        entry = self._entry(identifier)
+        if not entry.lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError(f"{identifier} is busy")
+        try:
+            self._ensure_connected(entry)
+        except BaseException:
+            entry.lock.release()
+            raise
+        entry.last_used = time.monotonic()
+        return entry.device
+
+    def release(self, device: LabJackDevice, healthy: bool = True):
+        """
+        Return a checked-out device. healthy=False (e.g. after an LJM error)
+        forces a health check before it is handed out again.
+        """
+        entry = self._entries.get(getattr(device, "identifier", None))
+        if entry is None or entry.device is not device:
+            return
+        now = time.monotonic()
+        entry.last_used = now
+        if healthy:
+            entry.last_ok = now
+        else:
+            entry.last_ok = 0.0
+        entry.lock.release()
+
+    @contextmanager
+    def device(self, identifier: str, timeout: Optional[float] = None) -> Iterator[LabJackDevice]:
+        dev = self.acquire(identifier, timeout)
+        healthy = True
+        try:
+            yield dev
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            self.release(dev, healthy)
+
+    def check(self, device: LabJackDevice) -> LabJackDevice:
+        """
+        Health-check a device the caller already holds (e.g. the shell's
+        session device), reconnecting it in place if the check fails.
+        """
+        entry = self._entries.get(getattr(device, "identifier", None))
+        if entry is None or entry.device is not device:
+            return device
+        self._ensure_connected(entry)
+        return entry.device
+
+    # ------------------ maintenance ------------------ #
+
+    def close_idle(self):
+        """
+        Close connections that are not checked out and have been idle for
+        longer than idle_timeout.
+        """
+        now = time.monotonic()
+        for entry in self._snapshot():
+            if entry.device is None or now - entry.last_used < self.idle_timeout:
+                continue
+            if entry.lock.acquire(blocking=False):
+                try:
+                    self._close_entry(entry)
+                finally:
+                    entry.lock.release()
+
+    def close_all(self):
+        for entry in self._snapshot():
+            with entry.lock:
+                self._close_entry(entry)
+
+    def identifiers(self) -> List[str]:
+        """
+        Identifiers with an open pooled connection.
+        """
+        return [e.identifier for e in self._snapshot() if e.device is not None]
+
+    def __enter__(self) -> "DevicePool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close_all()
+
+    # ------------------ internal helpers ------------------ #
+
+    def _entry(self, identifier: str) -> _PoolEntry:
+        with self._lock:
+            entry = self._entries.get(identifier)
+            if entry is None:
+                entry = self._entries[identifier] = _PoolEntry(identifier)
+            return entry
+
+    def _snapshot(self) -> List[_PoolEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def _ensure_connected(self, entry: _PoolEntry):
+        # Caller holds entry.lock
+        dev = entry.device
+        if dev is not None and dev.handle is not None:
+            if time.monotonic() - entry.last_ok < self.health_check_interval:
+                return
+            if self._healthy(dev):
+                entry.last_ok = time.monotonic()
+                return
+
+        now = time.monotonic()
+        if now < entry.retry_at:
+            raise ConnectionError(
+                f"{entry.identifier} unreachable; next retry in {entry.retry_at - now:.1f}s"
+            ) from entry.last_error
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.connect_attempts):
+            if attempt:
+                time.sleep(self._backoff(attempt - 1))
+            try:
+                if entry.device is not None:
+                    # Reconnect in place so holders of the object keep working
+                    entry.device.reconnect()
+                else:
+                    entry.device = LabJackDevice.connect(
+                        identifier=entry.identifier, backend=self.backend, **self.connect_kwargs
+                    )
+                entry.failures = 0
+                entry.retry_at = 0.0
+                entry.last_error = None
+                entry.last_ok = time.monotonic()
+                return
+            except Exception as e:
+                last_error = e
+
+        entry.failures += 1
+        entry.retry_at = time.monotonic() + self._backoff(entry.failures + self.connect_attempts - 1)
+        entry.last_error = last_error
+        # Chained so callers can still get at e.g. the LJM error code
+        raise ConnectionError(f"Could not connect to {entry.identifier}: {last_error}") from last_error
+
+    def _healthy(self, dev: LabJackDevice) -> bool:
+        try:
+            dev.modbus.read(HEALTH_CHECK_REGISTER)
+            return True
+        except Exception:
+            return False
+
+    def _backoff(self, n: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** n))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _close_entry(self, entry: _PoolEntry):
+        # Caller holds entry.lock
+        if entry.device is not None:
+            try:
+                entry.device.close()
+            except Exception:
+                pass
+            entry.device = None
@@ -0,0 +1,169 @@
+# t7sd_api/scheduler.py
+
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import functools
+import itertools
+import threading
+
+from .instrument import _DEVICE_CALLS
+
+# Priority classes, most urgent first.
+PRIORITIES: Dict[str, int] = {
+    "interactive": 0,   # a user waiting at the shell
+    "telemetry": 1,     # periodic register/USER_RAM polls
+    "bulk": 2,          # FILE_IO_READ chunks of long transfers
+    "background": 3,    # cache prefetch, inventory walks
+}
+
+# A waiting call that has been passed over this many times is served next,
+# whatever its class, so bulk and background work always make progress.
+DEFAULT_STARVATION_LIMIT = 8
+
+# Byte-array registers whose calls default to the "bulk" class.
+BULK_REGISTERS = ("FILE_IO_READ",)
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "skipped")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.skipped = 0
+
+
+class DeviceScheduler:
+    """
+    Hands out one LJM call at a time on a device handle: the waiting call
+    with the most urgent priority class goes first (FIFO within a class),
+    with aging so lower classes are never starved.
+
+    Scheduling is per call, not per operation: a long SD transfer still
+    holds SDInterface.lock for its whole FILE_IO sequence, but register
+    reads from other threads are served between its FILE_IO_READ chunks.
+    """
+
+    def __init__(self, starvation_limit: int = DEFAULT_STARVATION_LIMIT):
+        self.starvation_limit = starvation_limit
+        self._cond = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._busy = False
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self.granted: Dict[str, int] = {name: 0 for name in PRIORITIES}
+
+    # ---- priority context ---- #
+
+    @contextmanager
+    def priority(self, name: str):
+        """
+        Run the LJM calls made by this thread inside the block at class name.
+        """
+        if name not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{name}' (expected one of {', '.join(PRIORITIES)})")
+        stack = self._stack()
+        stack.append(PRIORITIES[name])
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def current_priority(self) -> Optional[int]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    # ---- call slots ---- #
+
+    @contextmanager
+    def slot(self, default: int = PRIORITIES["interactive"]):
+        """
+        Wait for this thread's turn on the handle and hold it for one call.
+        """
+        current = self.current_priority()
+        ticket = _Ticket(default if current is None else current, next(self._seq))
+        with self._cond:
+            self._waiting.append(ticket)
+            while self._busy or self._next() is not ticket:
+                self._cond.wait()
+            self._waiting.remove(ticket)
+            for other in self._waiting:
+                other.skipped += 1
+            self._busy = True
+            self.granted[_CLASS_NAMES[ticket.priority]] += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _next(self) -> Optional[_Ticket]:
+        if not self._waiting:
+            return None
+        starved = [t for t in self._waiting if t.skipped >= self.starvation_limit]
+        if starved:
+            return min(starved, key=lambda t: t.seq)
+        return min(self._waiting, key=lambda t: (t.priority, t.seq))
+
+    def _stack(self) -> List[int]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+
+_CLASS_NAMES = {v: k for k, v in PRIORITIES.items()}
+
+
+def _default_priority(func: str, args) -> int:
+    if func.startswith("eReadNameByteArray") and len(args) > 1 and args[1] in BULK_REGISTERS:
+        return PRIORITIES["bulk"]
+    return PRIORITIES["interactive"]
+
+
+class ScheduledLJM:
+    """
+    Stand-in for the `labjack.ljm` module that routes every device call
+    through a DeviceScheduler. Like InstrumentedLJM, anything that is not a
+    device call (constants, LJMError, stats, ...) passes straight through,
+    so the two proxies can be stacked.
+    """
+
+    def __init__(self, backend: Any, scheduler: Optional[DeviceScheduler] = None):
+        self._backend = backend
+        self.scheduler = scheduler if scheduler is not None else DeviceScheduler()
+
+    def __getattr__(self, attr: str):
+        value = getattr(self._backend, attr)
+        if attr not in _DEVICE_CALLS:
+            return value
+
+        scheduler = self.scheduler
+
+        @functools.wraps(value)
+        def scheduled(*args):
+            with scheduler.slot(_default_priority(attr, args)):
+                return value(*args)
+
+        return scheduled
+
+    def eReadNameByteArrayInto(self, handle: int, name: str, buffer):
+        from .backend import read_name_byte_array_into
+
+        with self.scheduler.slot(_default_priority("eReadNameByteArrayInto", (handle, name))):
+            read_name_byte_array_into(self._backend, handle, name, buffer)
+
+
+@contextmanager
+def priority(lj: Any, name: str):
+    """
+    Run the block's LJM calls at class name if lj (a device's `ljm`) is
+    scheduled; a no-op otherwise.
+    """
+    scheduler = getattr(lj, "scheduler", None)
+    if scheduler is None:
+        yield
+        return
+    with scheduler.priority(name):
+        yield
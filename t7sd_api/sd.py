@@ -1,20 +1,254 @@
 from __future__ import annotations
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Tuple, Optional
+import functools
+import inspect
+import json
 import os
+import posixpath
+import sqlite3
+import threading
+import time
 
-from labjack import ljm
-from . import sd_utils
+from .backend import ljm, read_name_byte_array_into
+from .instrument import operation
+from .sd_index import SDIndex
+
+# Bytes reserved for Modbus framing when sizing a single FILE_IO_READ packet.
+PACKET_OVERHEAD_BYTES = 16
+
+# maxBytesPerMB for a T7 over Ethernet/WiFi, used when the handle info is unknown.
+DEFAULT_MAX_BYTES_PER_MB = 1040
+
+# Initial size of the reusable buffer for FILE_IO_PATH_READ (FAT long names
+# are at most 255 characters plus the terminator); it grows if ever needed.
+NAME_BUFFER_BYTES = 256
+
+# How often (in received bytes) a resumable download checkpoints its sidecar.
+PARTIAL_STATE_INTERVAL_BYTES = 64 * 1024
+
+# Per-entry metadata read while enumerating a directory.
+DIR_ENTRY_INFO = [
+    "FILE_IO_PATH_READ_LEN_BYTES",
+    "FILE_IO_SIZE_BYTES",
+    "FILE_IO_ATTRIBUTES",
+]
+
+# FILE_IO_INVALID_OBJECT / FILE_IO_NOT_FOUND: no (more) directory entries.
+DIR_END_ERROR_CODES = (2809, 2960)
+
+# Per-directory manifest written by SDInterface.sync().
+SYNC_MANIFEST_NAME = ".t7sd_manifest.json"
+
+
+# FILE_IO_ATTRIBUTES bits
+ATTR_DIRECTORY = 1 << 4
+ATTR_ARCHIVE = 1 << 5  # set on regular files
 
 
 @dataclass
 class SDEntry:
+    # Slots instead of a per-instance __dict__: listings can be large
+    __slots__ = ("name", "size", "is_file", "is_dir", "raw_attr")
+
     name: str
     size: int
     is_file: bool
     is_dir: bool
     raw_attr: int
 
+    @classmethod
+    def from_raw(cls, name: str, size: int, attr: int) -> "SDEntry":
+        return cls(
+            name=name,
+            size=size,
+            is_file=bool(attr & ATTR_ARCHIVE),
+            is_dir=bool(attr & ATTR_DIRECTORY),
+            raw_attr=attr,
+        )
+
+
+class DirListing:
+    """
+    Column-oriented directory listing for large directories.
+
+    Names live in one "\0"-separated string with an offsets column; sizes and
+    attributes are array('Q')/array('B') columns. Indexing or iterating
+    builds SDEntry views on demand, and the filters work on the columns
+    without creating any per-entry objects.
+    """
+
+    __slots__ = ("path", "_names", "_offsets", "sizes", "attrs", "_lower")
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self._names = ""
+        self._offsets = array("I", [0])  # name i is _names[_offsets[i]:_offsets[i + 1] - 1]
+        self.sizes = array("Q")
+        self.attrs = array("B")
+        self._lower: Optional[str] = None
+
+    @classmethod
+    def from_rows(cls, path: str, rows) -> "DirListing":
+        """
+        Build from (name, size, attr) tuples, e.g. raw FILE_IO enumeration.
+        """
+        listing = cls(path)
+        names: List[str] = []
+        offsets, sizes, attrs = listing._offsets, listing.sizes, listing.attrs
+        end = 0
+        for name, size, attr in rows:
+            names.append(name)
+            end += len(name) + 1
+            offsets.append(end)
+            sizes.append(size)
+            attrs.append(attr & 0xFF)
+        names.append("")
+        listing._names = "\0".join(names)
+        return listing
+
+    # ---- entry access ---- #
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def name(self, i: int) -> str:
+        return self._names[self._offsets[i]:self._offsets[i + 1] - 1]
+
+    def names(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.name(i)
+
+    def __getitem__(self, i: int) -> SDEntry:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("DirListing index out of range")
+        return SDEntry.from_raw(self.name(i), self.sizes[i], self.attrs[i])
+
+    def __iter__(self) -> Iterator[SDEntry]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def rows(self) -> Iterator[Tuple[str, int, int]]:
+        for i in range(len(self)):
+            yield self.name(i), self.sizes[i], self.attrs[i]
+
+    def find(self, name: str) -> Optional[int]:
+        """
+        Index of the entry called name, or None.
+        """
+        needle = name + "\0"
+        start = 0
+        while True:
+            pos = self._names.find(needle, start)
+            if pos < 0:
+                return None
+            if pos == 0 or self._names[pos - 1] == "\0":
+                return self._index_at(pos)
+            start = pos + 1
+
+    def is_dir(self, i: int) -> bool:
+        return bool(self.attrs[i] & ATTR_DIRECTORY)
+
+    def is_file(self, i: int) -> bool:
+        return bool(self.attrs[i] & ATTR_ARCHIVE)
+
+    def total_file_bytes(self) -> int:
+        return sum(size for size, attr in zip(self.sizes, self.attrs) if attr & ATTR_ARCHIVE)
+
+    # ---- filters ---- #
+
+    def filter(
+        self,
+        extension: Optional[str] = None,
+        prefix: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        files_only: bool = False,
+        dirs_only: bool = False,
+    ) -> "DirListing":
+        """
+        Entries matching every given criterion, as a new DirListing.
+        extension and prefix are case-insensitive (FAT names are); sizes are
+        inclusive bounds in bytes.
+        """
+        return self.take(self.indices(
+            extension, prefix, min_size, max_size, files_only, dirs_only
+        ))
+
+    def indices(
+        self,
+        extension: Optional[str] = None,
+        prefix: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        files_only: bool = False,
+        dirs_only: bool = False,
+    ) -> array:
+        """
+        Positions (array('I')) of the entries matching filter()'s criteria.
+        """
+        if extension is not None and not extension.startswith("."):
+            extension = "." + extension
+        names = self._lower_names() if extension or prefix else self._names
+        suffix = (extension.lower() + "\0") if extension else None
+        prefix = prefix.lower() if prefix else None
+        offsets, sizes, attrs = self._offsets, self.sizes, self.attrs
+
+        matched = array("I")
+        for i in range(len(sizes)):
+            size, attr = sizes[i], attrs[i]
+            if files_only and not attr & ATTR_ARCHIVE:
+                continue
+            if dirs_only and not attr & ATTR_DIRECTORY:
+                continue
+            if min_size is not None and size < min_size:
+                continue
+            if max_size is not None and size > max_size:
+                continue
+            # startswith/endswith with bounds compare in place, no slicing
+            if prefix and not names.startswith(prefix, offsets[i], offsets[i + 1] - 1):
+                continue
+            if suffix and not names.endswith(suffix, offsets[i], offsets[i + 1]):
+                continue
+            matched.append(i)
+        return matched
+
+    def take(self, positions) -> "DirListing":
+        """
+        New DirListing holding the entries at the given positions.
+        """
+        return DirListing.from_rows(
+            self.path, ((self.name(i), self.sizes[i], self.attrs[i]) for i in positions)
+        )
+
+    # ---- helpers ---- #
+
+    def _lower_names(self) -> str:
+        if self._lower is None:
+            lower = self._names.lower()
+            # Offsets only stay valid if lowering kept every character single
+            self._lower = lower if len(lower) == len(self._names) else self._names
+        return self._lower
+
+    def _index_at(self, pos: int) -> int:
+        # Binary search for the entry whose name starts at pos
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._offsets[mid] < pos:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __repr__(self) -> str:
+        return f"DirListing({self.path!r}, {len(self)} entries)"
+
 
 @dataclass
 class DiskInfo:
@@ -40,20 +274,127 @@ class DiskInfo:
         return self.free_bytes / 1048576.0
 
 
+class TransferCancelled(Exception):
+    """
+    Raised when a download is stopped through its cancel event. The file has
+    been closed on the device, the cwd restored and the .part file and
+    sidecar saved, so the download can be resumed later.
+    """
+
+
+@dataclass
+class SyncResult:
+    name: str
+    action: str         # "skipped" or "downloaded"
+    bytes_written: int
+
+
+class SDPreempted(Exception):
+    """
+    Raised inside SDInterface.preemptible() when a directory enumeration is
+    abandoned because another thread is waiting for the interface. The lock
+    is released and the cwd restored; the listing can simply be retried.
+    """
+
+
+def _locked(fn):
+    """
+    Hold the interface's lock for the whole call (or the whole iteration, for
+    generators): FILE_IO is a single stateful channel per device.
+    """
+    if inspect.isgeneratorfunction(fn):
+
+        @functools.wraps(fn)
+        def gen_wrapper(self, *args, **kwargs):
+            with self._hold():
+                yield from fn(self, *args, **kwargs)
+
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with self._hold():
+            return fn(self, *args, **kwargs)
+
+    return wrapper
+
+
 class SDInterface:
     """
     Encapsulates SD-card operations for a single device handle.
     """
 
-    def __init__(self, handle: int):
+    def __init__(
+        self,
+        handle: int,
+        max_bytes_per_mb: int = DEFAULT_MAX_BYTES_PER_MB,
+        lj: Any = ljm,
+        index: Optional[SDIndex] = None,
+    ):
         self.handle = handle
+        self.max_bytes_per_mb = max_bytes_per_mb
+        self.ljm = lj
+
+        # Client-side copy of the device cwd; None until first queried.
+        self._cwd: Optional[str] = None
+
+        # Use the batched directory enumeration; False falls back to the
+        # one-register-at-a-time loop from LabJack's sd_utils example.
+        self.batched_dir_reads = True
+
+        # Reused by every FILE_IO_PATH_READ so name decoding allocates nothing
+        # but the resulting str.
+        self._name_buffer = bytearray(NAME_BUFFER_BYTES)
+
+        # Serializes FILE_IO sequences between threads (e.g. a background
+        # prefetcher and the foreground shell); re-entrant so public methods
+        # can call each other.
+        self.lock = threading.RLock()
+
+        # callback(event, abs_path) for "chdir", "delete" and "download"
+        self._listeners: List[Callable[[str, str], None]] = []
+
+        # Threads blocked on the lock outside preemptible(); a preemptible
+        # directory enumeration gives way as soon as this is non-zero.
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+        self._local = threading.local()
+
+        # Optional persistent listings (see sd_index.py). Every listing read
+        # from the device is written through; listings younger than
+        # index_max_age seconds are returned by list_dir/listing/iter_dir
+        # instead of asking the device. None (the default) never trusts the
+        # index. File sizes for downloads and sync always come from the device.
+        self.index = index
+        self.index_max_age: Optional[float] = None
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        Largest FILE_IO_READ size that fits in one packet (kept even, >= 2).
+        """
+        size = self.max_bytes_per_mb - PACKET_OVERHEAD_BYTES
+        return max(2, size - (size % 2))
 
     # ------------------ internal helpers ------------------ #
 
     def _sanitize_path_for_sd(self, path: str) -> str:
         if not path:
             path = "/"
-        return sd_utils.sanitizePath(path)
+        # FILE_IO paths are null-terminated
+        if path[-1] != "\x00":
+            path += "\x00"
+        return path
+
+    def _resolve_path(self, path: str) -> str:
+        """
+        Resolve path against the tracked cwd into a normalized absolute path.
+        """
+        if not path.startswith("/"):
+            path = posixpath.join(self.get_cwd(), path)
+        path = posixpath.normpath(path)
+        # normpath keeps a leading "//"
+        return "/" + path.lstrip("/")
 
     def _resolve_dir_and_file(self, sd_path: str) -> Tuple[str, str]:
         if not sd_path:
@@ -63,94 +404,665 @@ class SDInterface:
             raise ValueError(f"Path '{sd_path}' does not contain a filename.")
         return dir_part, filename
 
+    @contextmanager
+    def _in_dir(self, dir_part: str):
+        """
+        Temporarily change into dir_part, restoring the original cwd afterwards.
+        """
+        original_cwd = self.get_cwd()
+        try:
+            if dir_part:
+                self._change_dir(self._resolve_path(dir_part))
+            yield
+        finally:
+            self._change_dir(original_cwd)
+
+    def _change_dir(self, target: str):
+        """
+        Move the device to absolute path target unless it is already there.
+        """
+        if target == self._cwd:
+            return
+
+        try:
+            self._write_path(target)
+            self.ljm.eWriteName(self.handle, "FILE_IO_DIR_CHANGE", 1)
+        except Exception:
+            # We no longer know where the device is
+            self.invalidate()
+            raise
+        self._cwd = target
+
+    @contextmanager
+    def _hold(self):
+        if not self.lock.acquire(blocking=False):
+            counted = not getattr(self._local, "preemptible", False)
+            if counted:
+                with self._waiting_lock:
+                    self._waiting += 1
+            try:
+                self.lock.acquire()
+            finally:
+                if counted:
+                    with self._waiting_lock:
+                        self._waiting -= 1
+        try:
+            yield
+        finally:
+            self.lock.release()
+
+    @contextmanager
+    def preemptible(self):
+        """
+        Run this thread's SD operations in the block as background work:
+        directory enumerations raise SDPreempted between entries when another
+        thread is waiting for the interface, instead of making it wait for
+        the whole listing. The device cannot resume an enumeration after
+        another operation, so the caller retries the listing later.
+        """
+        previous = getattr(self._local, "preemptible", False)
+        self._local.preemptible = True
+        try:
+            yield
+        finally:
+            self._local.preemptible = previous
+
+    def _check_preempted(self):
+        if self._waiting and getattr(self._local, "preemptible", False):
+            raise SDPreempted("SD listing interrupted by a waiting operation")
+
+    def _notify(self, event: str, path: str):
+        for callback in list(self._listeners):
+            try:
+                callback(event, path)
+            except Exception:
+                # A broken listener must not fail the SD operation itself
+                pass
+
+    def _file_size_in_cwd(self, filename: str, sd_path: str) -> int:
+        found = self._find_in_cwd(filename)
+        if found is None:
+            raise FileNotFoundError(f"File not found on SD: {sd_path}")
+        return found[1]
+
+    def _find_in_cwd(self, name: str) -> Optional[Tuple[str, int, int]]:
+        """
+        (name, size, attr) of name in the cwd, or None. Enumeration stops at
+        the match, so entries near the top of a large directory are cheap.
+        Always asks the device: an indexed size may be stale (a log that has
+        grown since) and would cut downloads short.
+        """
+        entries = self._iter_raw_dir_contents()
+        try:
+            for row in entries:
+                if row[0] == name:
+                    return row
+        finally:
+            entries.close()
+        return None
+
+    def _iter_raw_dir_contents(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Yield (name, size, attributes) for each entry of the cwd.
+        """
+        if not self.batched_dir_reads:
+            yield from self._iter_raw_dir_contents_unbatched()
+            return
+
+        # Two round trips per entry instead of five: the metadata reads are one
+        # eReadNames, and each FILE_IO_DIR_NEXT write carries the next entry's
+        # metadata reads in the same packet.
+        try:
+            self.ljm.eWriteName(self.handle, "FILE_IO_DIR_FIRST", 1)
+        except self.ljm.LJMError as e:
+            if e.errorCode in DIR_END_ERROR_CODES:
+                return
+            raise
+        info = self.ljm.eReadNames(self.handle, len(DIR_ENTRY_INFO), DIR_ENTRY_INFO)
+
+        next_names = ["FILE_IO_DIR_NEXT"] + DIR_ENTRY_INFO
+        next_writes = [self.ljm.constants.WRITE] + [self.ljm.constants.READ] * len(DIR_ENTRY_INFO)
+        next_num_values = [1] * len(next_names)
+        next_values = [1] + [0] * len(DIR_ENTRY_INFO)
+
+        while True:
+            name_len, size, attr = (int(v) for v in info)
+            yield self._read_path(name_len), size, attr
+
+            self._check_preempted()
+            try:
+                values = self.ljm.eNames(
+                    self.handle,
+                    len(next_names),
+                    next_names,
+                    next_writes,
+                    next_num_values,
+                    next_values,
+                )
+            except self.ljm.LJMError as e:
+                if e.errorCode in DIR_END_ERROR_CODES:
+                    return
+                raise
+            info = values[1:]
+
+    def _iter_raw_dir_contents_unbatched(self) -> Iterator[Tuple[str, int, int]]:
+        """
+        Five round trips per entry, as in sd_utils.getCurDirContents.
+        """
+        self.ljm.eWriteName(self.handle, "FILE_IO_DIR_FIRST", 1)
+        while True:
+            name_len = int(self.ljm.eReadName(self.handle, "FILE_IO_PATH_READ_LEN_BYTES"))
+            size = int(self.ljm.eReadName(self.handle, "FILE_IO_SIZE_BYTES"))
+            attr = int(self.ljm.eReadName(self.handle, "FILE_IO_ATTRIBUTES"))
+            yield self._read_path(name_len), size, attr
+
+            self._check_preempted()
+            try:
+                self.ljm.eWriteName(self.handle, "FILE_IO_DIR_NEXT", 1)
+            except self.ljm.LJMError:
+                return
+
+    def _write_path(self, path: str):
+        """
+        Load path (null-terminated here) into FILE_IO_PATH_WRITE.
+        """
+        path_nt = self._sanitize_path_for_sd(path)
+        path_len = len(path_nt)
+        self.ljm.eWriteName(self.handle, "FILE_IO_PATH_WRITE_LEN_BYTES", path_len)
+        self.ljm.eWriteNameByteArray(
+            self.handle, "FILE_IO_PATH_WRITE", path_len, bytearray(path_nt, "ascii")
+        )
+
+    def _query_cwd(self) -> str:
+        self.ljm.eWriteName(self.handle, "FILE_IO_DIR_CURRENT", 1)
+        path_len = int(self.ljm.eReadName(self.handle, "FILE_IO_PATH_READ_LEN_BYTES"))
+        return self._read_path(path_len)
+
+    def _read_path(self, path_len: int) -> str:
+        """
+        Read and decode FILE_IO_PATH_READ through the reusable name buffer.
+        """
+        if path_len <= 0:
+            return ""
+        if path_len > len(self._name_buffer):
+            self._name_buffer = bytearray(path_len)
+        view = memoryview(self._name_buffer)[:path_len]
+        read_name_byte_array_into(self.ljm, self.handle, "FILE_IO_PATH_READ", view)
+        return str(view, "latin-1").rstrip("\x00")
+
+    def _iter_open_file(
+        self,
+        filename: str,
+        file_size: int,
+        chunk_size: Optional[int] = None,
+        offset: int = 0,
+        out: Optional[memoryview] = None,
+    ) -> Iterator[memoryview]:
+        """
+        Open filename in the cwd and yield its contents one FILE_IO_READ at a time,
+        starting at offset. FILE_IO_READ is strictly sequential, so the first
+        offset bytes are still read from the device but are discarded here.
+        The file is always closed, even if the consumer stops early.
+
+        Each chunk is read straight into a buffer and yielded as a memoryview:
+        consecutive slices of out when given (which must hold the rest of the
+        file), otherwise one reused scratch buffer that is only valid until
+        the next chunk is requested.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        scratch = memoryview(bytearray(chunk_size)) if out is None else None
+
+        self._write_path(filename)
+        self.ljm.eWriteName(self.handle, "FILE_IO_OPEN", 1)
+        try:
+            to_skip = min(offset, file_size)
+            skip_buffer = scratch if scratch is not None else memoryview(
+                bytearray(min(chunk_size, to_skip))
+            )
+            while to_skip > 0:
+                num_bytes = min(chunk_size, to_skip)
+                read_name_byte_array_into(
+                    self.ljm, self.handle, "FILE_IO_READ", skip_buffer[:num_bytes]
+                )
+                to_skip -= num_bytes
+
+            pos = 0
+            remaining = file_size - min(offset, file_size)
+            while remaining > 0:
+                num_bytes = min(chunk_size, remaining)
+                view = scratch[:num_bytes] if out is None else out[pos:pos + num_bytes]
+                read_name_byte_array_into(self.ljm, self.handle, "FILE_IO_READ", view)
+                pos += num_bytes
+                remaining -= num_bytes
+                yield view
+        finally:
+            self.ljm.eWriteName(self.handle, "FILE_IO_CLOSE", 1)
+
+    def _download_in_cwd(
+        self,
+        filename: str,
+        file_size: int,
+        sd_path: str,
+        local_path: str,
+        resume: bool = False,
+        part_path: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Download filename (already looked up in the cwd) via a .part file.
+        """
+        part_path = part_path or local_path + ".part"
+        state_path = part_path + ".json"
+
+        received = 0
+        if resume:
+            received = _load_partial_state(state_path, part_path, sd_path, file_size)
+
+        state = {"remote": sd_path, "size": file_size, "received": received}
+        with open(part_path, "r+b" if received else "wb") as f:
+            f.truncate(received)
+            f.seek(received)
+            _save_partial_state(state_path, state)
+
+            checkpoint = received
+            try:
+                for chunk in self._iter_open_file(filename, file_size, offset=received):
+                    if cancel is not None and cancel.is_set():
+                        raise TransferCancelled(sd_path)
+                    f.write(chunk)
+                    state["received"] += len(chunk)
+                    if state["received"] - checkpoint >= PARTIAL_STATE_INTERVAL_BYTES:
+                        f.flush()
+                        _save_partial_state(state_path, state)
+                        checkpoint = state["received"]
+            finally:
+                f.flush()
+                _save_partial_state(state_path, state)
+
+        os.replace(part_path, local_path)
+        os.remove(state_path)
+        return state["received"] - received
+
+    def _listing_in_cwd(self) -> DirListing:
+        """
+        List the cwd from the device, writing the listing through to the index.
+        """
+        listing = DirListing.from_rows(self.get_cwd(), self._iter_raw_dir_contents())
+        self._index_call("put", listing.path, listing.rows())
+        return listing
+
+    def _entries_in_cwd(self) -> List[SDEntry]:
+        return list(self._listing_in_cwd())
+
+    def _fresh_rows(
+        self, abs_path: str, max_age: Optional[float] = None
+    ) -> Optional[List[Tuple[str, int, int]]]:
+        """
+        Indexed rows of abs_path if younger than max_age (default
+        index_max_age) seconds, else None.
+        """
+        if max_age is None:
+            max_age = self.index_max_age
+        if self.index is None or max_age is None:
+            return None
+        cached = self._index_call("get", abs_path)
+        if cached is None or time.time() - cached[0] > max_age:
+            return None
+        return cached[1]
+
+    def _fresh_listing(
+        self, abs_path: str, max_age: Optional[float] = None
+    ) -> Optional[List[SDEntry]]:
+        rows = self._fresh_rows(abs_path, max_age)
+        return None if rows is None else [SDEntry.from_raw(*row) for row in rows]
+
+    def _index_call(self, method: str, *args):
+        # The index is an optimization: a locked or damaged file must never
+        # fail the device operation itself.
+        if self.index is None:
+            return None
+        try:
+            return getattr(self.index, method)(*args)
+        except sqlite3.Error:
+            return None
+
     # ------------------ public SD API ------------------ #
 
+    @operation("sd.get_cwd")
+    @_locked
     def get_cwd(self) -> str:
         """
         Get current working directory on SD card (without trailing null).
+        The device is only queried the first time (or after invalidate());
+        later calls return the client-side tracked cwd.
         """
-        raw = sd_utils.getCWD(self.handle)
-        return raw.rstrip("\x00")
+        if self._cwd is None:
+            raw = self._query_cwd()
+            self._cwd = "/" + posixpath.normpath(raw or "/").lstrip("/")
+        return self._cwd
 
+    @operation("sd.chdir")
+    @_locked
     def chdir(self, path: str):
         """
         Change current working directory on SD card.
+        Changing to the directory we are already in costs no round trips.
         """
-        sd_path = self._sanitize_path_for_sd(path)
-        sd_utils.goToPath(self.handle, sd_path)
+        target = self._resolve_path(path or "/")
+        self._change_dir(target)
+        self._notify("chdir", target)
 
-    def list_dir(self, path: Optional[str] = None) -> List[SDEntry]:
+    def invalidate(self):
+        """
+        Forget the tracked cwd so the next get_cwd() asks the device again.
+        Call this if another client may have changed the device's directory.
+        """
+        self._cwd = None
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """
+        Call callback(event, abs_path) after operations that change what the
+        card looks like to a client: "chdir" (new cwd), "delete" (removed
+        path) and "download" (file that was fetched, possibly grown since it
+        was last listed). Used by caches to drop stale entries.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, str], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def indexed_listing(self, path: Optional[str] = None) -> Optional[Tuple[float, List[SDEntry]]]:
+        """
+        (fetched_at, entries) for a directory from the persistent index, without
+        touching the device; None if there is no index or no listing yet.
+        fetched_at is a time.time() timestamp.
+        """
+        cached = self._index_call("get", self.abspath(path))
+        if cached is None:
+            return None
+        fetched_at, rows = cached
+        return fetched_at, [SDEntry.from_raw(*row) for row in rows]
+
+    def abspath(self, path: Optional[str]) -> str:
+        """
+        Normalized absolute form of path, resolved against the tracked cwd.
+        """
+        with self._hold():
+            return self._resolve_path(path or self.get_cwd())
+
+    @operation("sd.list_dir")
+    @_locked
+    def list_dir(
+        self, path: Optional[str] = None, max_age: Optional[float] = None
+    ) -> List[SDEntry]:
         """
         List contents of the given directory.
         If path is None, uses the current working directory.
+        With an index attached, a stored listing younger than max_age seconds
+        (default index_max_age) is returned without asking the device.
         """
-        start_dir = self.get_cwd()
-        try:
-            if path is not None:
-                self.chdir(path)
+        abs_path = self.abspath(path)
+        cached = self._fresh_listing(abs_path, max_age)
+        if cached is not None:
+            return cached
+        with self._in_dir(abs_path):
+            return self._entries_in_cwd()
 
-            raw_contents: Dict[str, Tuple[int, int]] = sd_utils.getCurDirContents(
-                self.handle
-            )
-            entries: List[SDEntry] = []
-            for raw_name, (size, attr) in raw_contents.items():
-                name = raw_name.rstrip("\x00")
-                is_file = bool(attr & (1 << 5))
-                is_dir = bool(attr & (1 << 4))
-                entries.append(
-                    SDEntry(
-                        name=name,
-                        size=size,
-                        is_file=is_file,
-                        is_dir=is_dir,
-                        raw_attr=attr,
-                    )
-                )
-            return entries
-        finally:
-            self.chdir(start_dir)
+    @operation("sd.listing")
+    @_locked
+    def listing(
+        self, path: Optional[str] = None, max_age: Optional[float] = None
+    ) -> DirListing:
+        """
+        Like list_dir(), but returns a compact DirListing (columnar storage,
+        no per-entry objects) for very large directories.
+        """
+        abs_path = self.abspath(path)
+        rows = self._fresh_rows(abs_path, max_age)
+        if rows is not None:
+            return DirListing.from_rows(abs_path, rows)
+        with self._in_dir(abs_path):
+            return self._listing_in_cwd()
 
-    def read_file_bytes(self, sd_path: str) -> bytes:
+    @operation("sd.iter_dir")
+    @_locked
+    def iter_dir(self, path: Optional[str] = None) -> Iterator[SDEntry]:
         """
-        Read a file from the SD card and return its raw bytes.
+        Yield the entries of a directory one at a time, as the device
+        enumerates them, so callers can print progressively or stop early.
+        A fresh indexed listing (see index_max_age) is used when available;
+        a fully consumed device listing is written through to the index.
+        """
+        abs_path = self.abspath(path)
+        cached = self._fresh_listing(abs_path)
+        if cached is not None:
+            yield from cached
+            return
+
+        with self._in_dir(abs_path):
+            rows = []
+            for row in self._iter_raw_dir_contents():
+                rows.append(row)
+                yield SDEntry.from_raw(*row)
+            self._index_call("put", abs_path, rows)
+
+    @operation("sd.stat")
+    @_locked
+    def stat(self, sd_path: str) -> SDEntry:
+        """
+        Return the SDEntry for one file or directory, enumerating its parent
+        directory only up to the match. Raises FileNotFoundError if absent.
+        """
+        abs_path = self._resolve_path(sd_path)
+        if abs_path == "/":
+            return SDEntry(name="/", size=0, is_file=False, is_dir=True, raw_attr=ATTR_DIRECTORY)
+
+        dir_part, name = posixpath.split(abs_path)
+        with self._in_dir(dir_part):
+            found = self._find_in_cwd(name)
+        if found is None:
+            raise FileNotFoundError(f"Not found on SD: {sd_path}")
+        return SDEntry.from_raw(*found)
+
+    @operation("sd.walk")
+    @_locked
+    def walk(
+        self,
+        top: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        onerror: Optional[Callable[[str, Exception], None]] = None,
+        compact: bool = False,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Depth-first traversal below top (default: the cwd), yielding
+        (dir_path, entries) for every directory as soon as it is listed.
+
+        Each directory costs one chdir: the walk moves straight from one
+        directory to the next rather than returning to top in between, and
+        the original cwd is restored once at the end. Directories that
+        cannot be listed are reported to onerror(path, exc) if given and
+        skipped otherwise, like os.walk. max_depth=0 lists only top.
+        With compact=True, entries is a DirListing instead of a list, which
+        keeps memory flat when walking cards with many thousands of files.
         """
         original_cwd = self.get_cwd()
+        stack: List[Tuple[str, int]] = [(self._resolve_path(top or original_cwd), 0)]
         try:
-            dir_part, filename = self._resolve_dir_and_file(sd_path)
-            if dir_part:
-                self.chdir(dir_part)
+            while stack:
+                dir_path, depth = stack.pop()
+                try:
+                    self._change_dir(dir_path)
+                    listing = self._listing_in_cwd()
+                    entries = listing if compact else list(listing)
+                except self.ljm.LJMError as e:
+                    if onerror is not None:
+                        onerror(dir_path, e)
+                    continue
 
-            # Get directory contents to find file size & real name
-            dir_contents = sd_utils.getCurDirContents(self.handle)
-            matched_key = None
-            for key in dir_contents.keys():
-                if key.rstrip("\x00") == filename:
-                    matched_key = key
-                    break
+                yield dir_path, entries
 
-            if matched_key is None:
-                raise FileNotFoundError(f"File not found on SD: {sd_path}")
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                # Reversed so children are visited in listing order
+                for i in reversed(range(len(listing))):
+                    name = listing.name(i)
+                    if listing.is_dir(i) and name not in (".", ".."):
+                        stack.append((posixpath.join(dir_path, name), depth + 1))
+        finally:
+            self._change_dir(original_cwd)
 
-            file_size = dir_contents[matched_key][0]
+    @operation("sd.iter_file_chunks")
+    @_locked
+    def iter_file_chunks(
+        self, sd_path: str, chunk_size: Optional[int] = None, offset: int = 0
+    ) -> Iterator[bytes]:
+        """
+        Stream a file from the SD card as a sequence of byte chunks.
+        Chunks default to one packet (see chunk_size) so memory use stays flat
+        regardless of file size. Bytes before offset are skipped.
+        """
+        dir_part, filename = self._resolve_dir_and_file(sd_path)
+        with self._in_dir(dir_part):
+            file_size = self._file_size_in_cwd(filename, sd_path)
+            for view in self._iter_open_file(filename, file_size, chunk_size, offset):
+                yield bytes(view)
 
-            # Prepare filename for FILE_IO
-            filename_nt = sd_utils.sanitizePath(filename)
-            name_len = len(filename_nt)
-            name_bytes = bytearray(filename_nt, "ascii")
+    @operation("sd.download_to")
+    @_locked
+    def download_to(
+        self, sd_path: str, fileobj: BinaryIO, chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Stream a file from the SD card into a writable binary file object.
+        Returns the number of bytes written.
+        """
+        written = 0
+        dir_part, filename = self._resolve_dir_and_file(sd_path)
+        with self._in_dir(dir_part):
+            file_size = self._file_size_in_cwd(filename, sd_path)
+            for view in self._iter_open_file(filename, file_size, chunk_size):
+                fileobj.write(view)
+                written += len(view)
+        return written
 
-            ljm.eWriteName(self.handle, "FILE_IO_PATH_WRITE_LEN_BYTES", name_len)
-            ljm.eWriteNameByteArray(
-                self.handle, "FILE_IO_PATH_WRITE", name_len, name_bytes
-            )
-            ljm.eWriteName(self.handle, "FILE_IO_OPEN", 1)
-            data_bytes = ljm.eReadNameByteArray(
-                self.handle, "FILE_IO_READ", file_size
+    @operation("sd.readinto")
+    @_locked
+    def readinto(self, sd_path: str, buffer, offset: int = 0) -> int:
+        """
+        Read a file from the SD card directly into a caller-provided writable
+        buffer (bytearray, memoryview, mmap, ...), starting at offset in the
+        file. Reads at most len(buffer) bytes; returns the number read.
+        """
+        target = memoryview(buffer).cast("B")
+        dir_part, filename = self._resolve_dir_and_file(sd_path)
+        with self._in_dir(dir_part):
+            file_size = self._file_size_in_cwd(filename, sd_path)
+            size = min(len(target), max(0, file_size - offset))
+            read = 0
+            for view in self._iter_open_file(
+                filename, offset + size, offset=offset, out=target
+            ):
+                read += len(view)
+        return read
+
+    @operation("sd.download_file")
+    @_locked
+    def download_file(
+        self,
+        sd_path: str,
+        local_path: str,
+        resume: bool = False,
+        part_path: Optional[str] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """
+        Download a file to local_path through a .part file and a JSON sidecar
+        recording the remote name, size and bytes received so far.
+
+        With resume=True a partial download of the same remote file and size is
+        continued from where it stopped; otherwise the download starts over.
+        The .part file is renamed to local_path once complete.
+        Setting cancel (from another thread) stops the transfer at the next
+        chunk with TransferCancelled, leaving it resumable.
+        Returns the number of bytes written by this call.
+        """
+        dir_part, filename = self._resolve_dir_and_file(sd_path)
+        with self._in_dir(dir_part):
+            file_size = self._file_size_in_cwd(filename, sd_path)
+            written = self._download_in_cwd(
+                filename, file_size, sd_path, local_path, resume, part_path, cancel
             )
-            ljm.eWriteName(self.handle, "FILE_IO_CLOSE", 1)
+        self._notify("download", self._resolve_path(sd_path))
+        return written
 
-            return bytes(data_bytes)
-        finally:
-            self.chdir(original_cwd)
+    @operation("sd.sync")
+    @_locked
+    def sync(self, remote_dir: str, local_dir: str) -> List[SyncResult]:
+        """
+        Mirror the files of remote_dir (non-recursive) into local_dir.
+
+        A manifest in local_dir records each file's size and last-synced time.
+        Unchanged files are skipped and anything else is downloaded in full.
+        That includes logs that only grew: the T7 has no FILE_IO seek, so
+        reaching the new tail means reading the whole prefix over the link
+        anyway (see _iter_open_file).
+        Returns one SyncResult per remote file.
+        """
+        os.makedirs(local_dir, exist_ok=True)
+        manifest_path = os.path.join(local_dir, SYNC_MANIFEST_NAME)
+        manifest = _load_manifest(manifest_path, remote_dir)
+        synced = manifest["files"]
+
+        results: List[SyncResult] = []
+        with self._in_dir(remote_dir):
+            # Sizes decide what to fetch, so never from the index
+            listing = self._entries_in_cwd()
+            files = [e for e in listing if e.is_file]
+            for entry in files:
+                local_path = os.path.join(local_dir, entry.name)
+                prev_size = synced.get(entry.name, {}).get("size")
+                local_size = (
+                    os.path.getsize(local_path) if os.path.exists(local_path) else None
+                )
+
+                if prev_size == entry.size and local_size == entry.size:
+                    results.append(SyncResult(entry.name, "skipped", 0))
+                    continue
+
+                remote_path = posixpath.join(remote_dir, entry.name)
+                written = self._download_in_cwd(
+                    entry.name, entry.size, remote_path, local_path, resume=True
+                )
+
+                synced[entry.name] = {
+                    "size": entry.size,
+                    "synced_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                _save_manifest(manifest_path, manifest)
+                results.append(SyncResult(entry.name, "downloaded", written))
+
+        # Forget files that no longer exist on the card (local copies are kept)
+        remote_names = {e.name for e in files}
+        for name in list(synced):
+            if name not in remote_names:
+                del synced[name]
+        _save_manifest(manifest_path, manifest)
+        return results
+
+    @operation("sd.read_file_bytes")
+    @_locked
+    def read_file_bytes(self, sd_path: str) -> bytes:
+        """
+        Read a file from the SD card and return its raw bytes.
+        """
+        dir_part, filename = self._resolve_dir_and_file(sd_path)
+        with self._in_dir(dir_part):
+            file_size = self._file_size_in_cwd(filename, sd_path)
+            data = bytearray(file_size)
+            for _ in self._iter_open_file(filename, file_size, out=memoryview(data)):
+                pass
+        return bytes(data)
 
     def read_file_text(
         self, sd_path: str, encoding: str = "utf-8", errors: str = "replace"
@@ -158,12 +1070,22 @@ class SDInterface:
         data = self.read_file_bytes(sd_path)
         return data.decode(encoding, errors=errors)
 
+    @operation("sd.delete_file")
+    @_locked
     def delete_file(self, sd_path: str):
         """
         Delete a file from the SD card.
         """
-        sd_utils.deleteFile(self.handle, sd_path)
+        self._write_path(sd_path)
+        print(f"Deleting file at {sd_path}")
+        self.ljm.eWriteName(self.handle, "FILE_IO_DELETE", 1)
+        print("Successfully deleted file.")
+        abs_path = self._resolve_path(sd_path)
+        self._index_call("remove", abs_path)
+        self._notify("delete", abs_path)
 
+    @operation("sd.get_disk_info")
+    @_locked
     def get_disk_info(self) -> DiskInfo:
         """
         Return SD card disk info as a DiskInfo object.
@@ -174,10 +1096,60 @@ class SDInterface:
             "FILE_IO_DISK_TOTAL_CLUSTERS",
             "FILE_IO_DISK_FREE_CLUSTERS",
         ]
-        vals = ljm.eReadNames(self.handle, len(names), names)
+        vals = self.ljm.eReadNames(self.handle, len(names), names)
         return DiskInfo(
             sector_size_bytes=int(vals[0]),
             sectors_per_cluster=int(vals[1]),
             total_clusters=int(vals[2]),
             free_clusters=int(vals[3]),
         )
+
+
+# ------------------ partial download state ------------------ #
+
+def _save_partial_state(state_path: str, state: Dict[str, Any]):
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def _load_partial_state(
+    state_path: str, part_path: str, sd_path: str, file_size: int
+) -> int:
+    """
+    Return how many bytes of part_path can be kept for this remote file,
+    or 0 if there is no usable partial download.
+    """
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        on_disk = os.path.getsize(part_path)
+    except (OSError, ValueError):
+        return 0
+
+    if state.get("remote") != sd_path or state.get("size") != file_size:
+        return 0
+    return max(0, min(int(state.get("received", 0)), on_disk, file_size))
+
+
+# ------------------ sync manifest ------------------ #
+
+def _load_manifest(manifest_path: str, remote_dir: str) -> Dict[str, Any]:
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+
+    # A manifest for a different remote directory says nothing about this one
+    if not manifest or manifest.get("remote_dir") != remote_dir:
+        manifest = {"remote_dir": remote_dir, "files": {}}
+    return manifest
+
+
+def _save_manifest(manifest_path: str, manifest: Dict[str, Any]):
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
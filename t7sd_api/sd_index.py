@@ -0,0 +1,117 @@
+# t7sd_api/sd_index.py
+
+from __future__ import annotations
+from typing import Iterable, List, Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+# Where per-device index files live unless overridden ($T7SD_INDEX_DIR).
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser("~"), ".t7sd", "index")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path       TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    dir      TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name     TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    attr     INTEGER NOT NULL,
+    PRIMARY KEY (dir, position)
+);
+"""
+
+# (name, size, raw attributes) as returned by the FILE_IO directory registers
+IndexRow = Tuple[str, int, int]
+
+
+def default_index_path(serial: int, index_dir: Optional[str] = None) -> str:
+    index_dir = index_dir or os.environ.get("T7SD_INDEX_DIR") or DEFAULT_INDEX_DIR
+    return os.path.join(index_dir, f"{serial}.sqlite")
+
+
+class SDIndex:
+    """
+    Persistent directory listings for one device, keyed by its serial number,
+    so shell and batch sessions can reuse listings fetched by earlier runs.
+
+    Stored in SQLite (one file per device). Every listing records when it was
+    fetched; callers decide how old is still acceptable.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        # WAL lets a shell and concurrent batch runs read while one writes
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    @classmethod
+    def for_serial(cls, serial: int, index_dir: Optional[str] = None) -> "SDIndex":
+        return cls(default_index_path(serial, index_dir))
+
+    def get(self, path: str) -> Optional[Tuple[float, List[IndexRow]]]:
+        """
+        Return (fetched_at, rows) for directory path, or None if never indexed.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at FROM dirs WHERE path = ?", (path,)
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._db.execute(
+                "SELECT name, size, attr FROM entries WHERE dir = ? ORDER BY position",
+                (path,),
+            ).fetchall()
+        return row[0], [(name, size, attr) for name, size, attr in rows]
+
+    def put(self, path: str, rows: Iterable[IndexRow], fetched_at: Optional[float] = None):
+        """
+        Replace the listing of directory path.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE dir = ?", (path,))
+            self._db.executemany(
+                "INSERT INTO entries (dir, position, name, size, attr) VALUES (?, ?, ?, ?, ?)",
+                ((path, i, name, size, attr) for i, (name, size, attr) in enumerate(rows)),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO dirs (path, fetched_at) VALUES (?, ?)",
+                (path, fetched_at),
+            )
+
+    def remove(self, path: str):
+        """
+        Forget path: its entry in the parent listing, and its own listing and
+        everything below it if it was a directory.
+        """
+        dir_part, _, name = path.rstrip("/").rpartition("/")
+        dir_part = dir_part or "/"
+        prefix = path.rstrip("/") + "/"
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM entries WHERE dir = ? AND name = ?", (dir_part, name)
+            )
+            for table, column in (("entries", "dir"), ("dirs", "path")):
+                self._db.execute(
+                    f"DELETE FROM {table} WHERE {column} = ? OR substr({column}, 1, ?) = ?",
+                    (path, len(prefix), prefix),
+                )
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM dirs")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,643 @@
+# t7sd_api/sim.py
+
+"""
+In-process T7 simulator implementing the subset of `labjack.ljm` used by
+t7sd_api: named register access, byte arrays, the FILE_IO state machine over
+an in-memory FAT-like tree, USER_RAM and the thermistor EF registers.
+
+    from t7sd_api import LabJackDevice
+    from t7sd_api.sim import SimulatedLJM
+
+    sim = SimulatedLJM(latency=0.02, bandwidth=250_000)
+    sim.add_device("192.168.1.4").add_file("/LOGS/a.csv", b"t,v\\n")
+    dev = LabJackDevice.connect("192.168.1.4", backend=sim)
+"""
+
+from __future__ import annotations
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+import math
+import random
+import re
+import threading
+import time
+import zlib
+
+# LJM / T7 error codes raised by the simulator
+LJME_INVALID_HANDLE = 1224
+LJME_DEVICE_NOT_FOUND = 1227
+LJME_NO_RESPONSE_BYTES_RECEIVED = 1239
+LJME_INVALID_NAME = 1294
+FILE_IO_INVALID_OBJECT = 2809
+FILE_IO_NOT_FOUND = 2960
+FILE_IO_FILE_NOT_OPEN = 2966
+
+# Approximate Modbus framing per transaction, used by the bandwidth model.
+PACKET_HEADER_BYTES = 12
+VALUE_BYTES = 4
+
+constants = SimpleNamespace(
+    dtANY=0,
+    dtT4=4,
+    dtT7=7,
+    dtT8=8,
+    ctANY=0,
+    ctUSB=1,
+    ctETHERNET=3,
+    ctWIFI=4,
+    READ=0,
+    WRITE=1,
+    UINT16=0,
+    UINT32=1,
+    INT32=2,
+    FLOAT32=3,
+    STRING=98,
+    BYTE=99,
+)
+
+
+class LJMError(Exception):
+    """
+    Mirrors labjack.ljm.LJMError (errorCode / errorAddress / errorString).
+    """
+
+    def __init__(self, errorCode=None, errorAddress=None, errorString=None):
+        self.errorCode = errorCode
+        self.errorAddress = errorAddress
+        self.errorString = errorString or f"LJM error {errorCode}"
+        super().__init__(self.errorString)
+
+    def __str__(self):
+        return f"{self.errorString} (error code {self.errorCode})"
+
+
+# ------------------ in-memory SD card ------------------ #
+
+ATTR_DIRECTORY = 1 << 4
+ATTR_FILE = 1 << 5
+
+
+class SimNode:
+    def __init__(self, name: str, is_dir: bool, data: bytes = b""):
+        self.name = name
+        self.is_dir = is_dir
+        self.data = bytearray(data)
+        self.children: Dict[str, "SimNode"] = {}   # upper-cased name -> node
+
+    @property
+    def size(self) -> int:
+        return 0 if self.is_dir else len(self.data)
+
+    @property
+    def attributes(self) -> int:
+        return ATTR_DIRECTORY if self.is_dir else ATTR_FILE
+
+    def child(self, name: str) -> Optional["SimNode"]:
+        # FAT names are case-insensitive
+        return self.children.get(name.upper())
+
+
+def _split(path: str) -> List[str]:
+    return [p for p in path.replace("\\", "/").split("/") if p]
+
+
+# Registers that hold plain numeric values
+_NUMERIC_REGISTER = re.compile(
+    r"^(AIN\d+|AIN\d+_RANGE|AIN\d+_RESOLUTION_INDEX|DAC[01]|[FECM]IO\d|DIO\d+|"
+    r"[FECM]IO_STATE|DIO_STATE|USER_RAM\d+_(F32|I32|U32|U16)|"
+    r"AIN\d+_EF_(INDEX|CONFIG_[A-J])|SERIAL_NUMBER|PRODUCT_ID|FIRMWARE_VERSION)$"
+)
+_EF_READ = re.compile(r"^AIN(\d+)_EF_READ_([A-D])$")
+_ANALOG_INPUT = re.compile(r"^AIN\d+$")
+
+
+def _build_address_map() -> Dict[str, Tuple[int, int]]:
+    """
+    Name -> (address, data type) for the registers the simulator understands,
+    following the T7 Modbus map.
+    """
+    f32, u32, u16 = constants.FLOAT32, constants.UINT32, constants.UINT16
+    table: Dict[str, Tuple[int, int]] = {}
+    for n in range(150):
+        table[f"AIN{n}"] = (2 * n, f32)
+    table["DAC0"] = (1000, f32)
+    table["DAC1"] = (1002, f32)
+    for prefix, base, count in (("FIO", 2000, 8), ("EIO", 2008, 8), ("CIO", 2016, 4), ("MIO", 2020, 3)):
+        for i in range(count):
+            table[f"{prefix}{i}"] = (base + i, u16)
+    for i in range(23):
+        table.setdefault(f"DIO{i}", (2000 + i, u16))
+    table.update({
+        "FIO_STATE": (2500, u16),
+        "EIO_STATE": (2501, u16),
+        "CIO_STATE": (2502, u16),
+        "MIO_STATE": (2503, u16),
+        "DIO_STATE": (2800, u32),
+    })
+    ef = {"INDEX": (9000, u32), "CONFIG_A": (9300, u32), "CONFIG_B": (9600, u32),
+          "CONFIG_C": (9900, u32), "CONFIG_D": (10200, u32), "CONFIG_E": (10500, f32),
+          "CONFIG_F": (10800, f32), "CONFIG_G": (11100, f32), "CONFIG_H": (11400, f32),
+          "CONFIG_I": (11700, f32), "CONFIG_J": (12000, f32), "READ_A": (7000, f32),
+          "READ_B": (7300, f32), "READ_C": (7600, f32), "READ_D": (7900, f32)}
+    for n in range(150):
+        for suffix, (base, dtype) in ef.items():
+            table[f"AIN{n}_EF_{suffix}"] = (base + 2 * n, dtype)
+        table[f"AIN{n}_RANGE"] = (40000 + 2 * n, f32)
+        table[f"AIN{n}_RESOLUTION_INDEX"] = (41500 + n, u16)
+    for i in range(40):
+        table[f"USER_RAM{i}_F32"] = (46000 + 2 * i, f32)
+        table[f"USER_RAM{i}_U32"] = (46100 + 2 * i, u32)
+    for i in range(10):
+        table[f"USER_RAM{i}_I32"] = (46080 + 2 * i, constants.INT32)
+    for i in range(20):
+        table[f"USER_RAM{i}_U16"] = (46180 + i, u16)
+    table.update({
+        "PRODUCT_ID": (60000, f32),
+        "FIRMWARE_VERSION": (60004, f32),
+        "SERIAL_NUMBER": (60028, u32),
+    })
+    return table
+
+
+ADDRESS_MAP = _build_address_map()
+NAME_AT_ADDRESS: Dict[int, str] = {}
+for _name, (_address, _dtype) in ADDRESS_MAP.items():
+    NAME_AT_ADDRESS.setdefault(_address, _name)
+
+
+class SimDevice:
+    """
+    State of one simulated T7: registers, SD card and FILE_IO state machine.
+    """
+
+    def __init__(
+        self,
+        identifier: str,
+        serial: int,
+        ip: int,
+        max_bytes_per_mb: int = 1040,
+        disk_bytes: int = 2 * 1024 ** 3,
+    ):
+        self.identifier = identifier
+        self.serial = serial
+        self.ip = ip
+        self.max_bytes_per_mb = max_bytes_per_mb
+        self.disk_bytes = disk_bytes
+        self.lock = threading.Lock()
+
+        self.root = SimNode("", True)
+        self.registers: Dict[str, float] = {
+            "SERIAL_NUMBER": float(serial),
+            "PRODUCT_ID": 7.0,
+            "FIRMWARE_VERSION": 1.0299,
+        }
+
+        # FILE_IO state
+        self.cwd: List[str] = []
+        self.path_write = b""
+        self.path_write_len = 0
+        self.path_read = b""
+        self.entry: Optional[SimNode] = None
+        self.listing: List[SimNode] = []
+        self.listing_index = 0
+        self.open_file: Optional[SimNode] = None
+        self.open_pos = 0
+
+    # ---- SD tree setup ---- #
+
+    def mkdir(self, path: str) -> SimNode:
+        node = self.root
+        for part in _split(path):
+            nxt = node.child(part)
+            if nxt is None:
+                nxt = node.children[part.upper()] = SimNode(part, True)
+            node = nxt
+        return node
+
+    def add_file(self, path: str, data: bytes) -> SimNode:
+        parts = _split(path)
+        parent = self.mkdir("/".join(parts[:-1]))
+        node = parent.children[parts[-1].upper()] = SimNode(parts[-1], False, data)
+        return node
+
+    def append_file(self, path: str, data: bytes):
+        node = self._lookup(_split(path))
+        if node is None or node.is_dir:
+            raise FileNotFoundError(path)
+        node.data += data
+
+    def _lookup(self, parts: List[str]) -> Optional[SimNode]:
+        node = self.root
+        for part in parts:
+            node = node.child(part) if node.is_dir else None
+            if node is None:
+                return None
+        return node
+
+    def _resolve(self, raw: bytes) -> List[str]:
+        path = raw.split(b"\x00", 1)[0].decode("latin-1")
+        parts = [] if path.startswith("/") else list(self.cwd)
+        for part in _split(path):
+            if part == ".":
+                continue
+            if part == "..":
+                if parts:
+                    parts.pop()
+                continue
+            parts.append(part)
+        return parts
+
+    def _canonical(self, parts: List[str]) -> List[str]:
+        # Use the on-card spelling of each component
+        node, out = self.root, []
+        for part in parts:
+            node = node.child(part)
+            out.append(node.name)
+        return out
+
+    def _used_bytes(self) -> int:
+        stack, total = [self.root], 0
+        while stack:
+            node = stack.pop()
+            total += node.size
+            stack.extend(node.children.values())
+        return total
+
+    # ---- register access ---- #
+
+    def read(self, name: str) -> float:
+        if name == "FILE_IO_PATH_READ_LEN_BYTES":
+            return float(len(self.path_read))
+        if name == "FILE_IO_SIZE_BYTES":
+            node = self.open_file or self.entry
+            return float(node.size if node else 0)
+        if name == "FILE_IO_ATTRIBUTES":
+            return float(self.entry.attributes if self.entry else 0)
+        if name.startswith("FILE_IO_DISK_"):
+            sector, per_cluster = 512, 64
+            cluster = sector * per_cluster
+            total = self.disk_bytes // cluster
+            used = -(-self._used_bytes() // cluster)
+            return float({
+                "FILE_IO_DISK_SECTOR_SIZE_BYTES": sector,
+                "FILE_IO_DISK_SECTORS_PER_CLUSTER": per_cluster,
+                "FILE_IO_DISK_TOTAL_CLUSTERS": total,
+                "FILE_IO_DISK_FREE_CLUSTERS": max(0, total - used),
+            }[name])
+
+        m = _EF_READ.match(name)
+        if m:
+            return self._ef_read(int(m.group(1)), m.group(2))
+        if name.startswith("AIN") and name[3:].isdigit():
+            # Slowly varying synthetic signal, distinct per channel
+            channel = int(name[3:])
+            return round(1.0 + 0.01 * channel + 0.005 * math.sin(time.time() + channel), 6)
+        if _NUMERIC_REGISTER.match(name):
+            return self.registers.get(name, 0.0)
+        raise LJMError(LJME_INVALID_NAME, errorString=f"LJME_INVALID_NAME: {name}")
+
+    def write(self, name: str, value: float):
+        if name == "FILE_IO_PATH_WRITE_LEN_BYTES":
+            self.path_write_len = int(value)
+        elif name == "FILE_IO_DIR_CURRENT":
+            self.path_read = ("/" + "/".join(self._canonical(self.cwd))).encode("latin-1") + b"\x00"
+        elif name == "FILE_IO_DIR_CHANGE":
+            parts = self._resolve(self.path_write)
+            node = self._lookup(parts)
+            if node is None or not node.is_dir:
+                raise LJMError(FILE_IO_NOT_FOUND, errorString="FILE_IO_NOT_FOUND")
+            self.cwd = self._canonical(parts)
+        elif name == "FILE_IO_DIR_FIRST":
+            self.listing = list(self._lookup(self.cwd).children.values())
+            self.listing_index = 0
+            self._select_entry()
+        elif name == "FILE_IO_DIR_NEXT":
+            self.listing_index += 1
+            if self.listing_index >= len(self.listing):
+                self.entry = None
+                raise LJMError(FILE_IO_INVALID_OBJECT, errorString="FILE_IO_INVALID_OBJECT")
+            self._select_entry()
+        elif name == "FILE_IO_OPEN":
+            node = self._lookup(self._resolve(self.path_write))
+            if node is None or node.is_dir:
+                raise LJMError(FILE_IO_NOT_FOUND, errorString="FILE_IO_NOT_FOUND")
+            self.open_file, self.open_pos = node, 0
+        elif name == "FILE_IO_CLOSE":
+            self.open_file, self.open_pos = None, 0
+        elif name == "FILE_IO_DELETE":
+            parts = self._resolve(self.path_write)
+            node = self._lookup(parts)
+            if node is None or not parts:
+                raise LJMError(FILE_IO_NOT_FOUND, errorString="FILE_IO_NOT_FOUND")
+            del self._lookup(parts[:-1]).children[parts[-1].upper()]
+        elif _NUMERIC_REGISTER.match(name) and not _ANALOG_INPUT.match(name):
+            self.registers[name] = float(value)
+        else:
+            raise LJMError(LJME_INVALID_NAME, errorString=f"LJME_INVALID_NAME: {name}")
+
+    def _select_entry(self):
+        if not self.listing:
+            self.entry = None
+            raise LJMError(FILE_IO_NOT_FOUND, errorString="FILE_IO_NOT_FOUND")
+        self.entry = self.listing[self.listing_index]
+        self.path_read = self.entry.name.encode("latin-1") + b"\x00"
+
+    def read_bytes_into(self, name: str, view: memoryview):
+        num_bytes = len(view)
+        if name == "FILE_IO_PATH_READ":
+            data = memoryview(self.path_read)[:num_bytes]
+        elif name == "FILE_IO_READ":
+            if self.open_file is None:
+                raise LJMError(FILE_IO_FILE_NOT_OPEN, errorString="FILE_IO_FILE_NOT_OPEN")
+            data = memoryview(self.open_file.data)[self.open_pos:self.open_pos + num_bytes]
+            self.open_pos += len(data)
+        else:
+            raise LJMError(LJME_INVALID_NAME, errorString=f"LJME_INVALID_NAME: {name}")
+        view[:len(data)] = data
+        view[len(data):] = bytes(num_bytes - len(data))
+
+    def read_bytes(self, name: str, num_bytes: int) -> List[int]:
+        buffer = bytearray(num_bytes)
+        self.read_bytes_into(name, memoryview(buffer))
+        return list(buffer)
+
+    def write_bytes(self, name: str, num_bytes: int, values):
+        if name != "FILE_IO_PATH_WRITE":
+            raise LJMError(LJME_INVALID_NAME, errorString=f"LJME_INVALID_NAME: {name}")
+        self.path_write = bytes(bytearray(values)[:num_bytes])
+
+    def _ef_read(self, channel: int, which: str) -> float:
+        prefix = f"AIN{channel}_EF_"
+        if int(self.registers.get(prefix + "INDEX", 0)) != 50 or which != "A":
+            return 0.0
+        # Steinhart-Hart on a fixed 10k-ish thermistor reading
+        a, b, c, d = (self.registers.get(prefix + f"CONFIG_{k}", 0.0) for k in "GHIJ")
+        ln_r = math.log(10000.0 + 50.0 * channel)
+        inv_t = a + b * ln_r + c * ln_r ** 2 + d * ln_r ** 3
+        return 1.0 / inv_t - 273.15 if inv_t else 0.0
+
+
+def populate_demo_card(device: SimDevice, log_files: int = 5, rows: int = 200):
+    """
+    Fill a device's card with a couple of telemetry CSVs and a LOGS directory.
+    """
+    def csv(seed: int, n: int) -> bytes:
+        lines = ["timestamp,AIN0,AIN1,TEMP"]
+        for i in range(n):
+            lines.append(f"{1700000000 + 60 * i},{1.0 + (i % 7) * 0.01:.4f},"
+                         f"{2.0 - (i % 5) * 0.01:.4f},{20 + (seed + i) % 10}.5")
+        return ("\n".join(lines) + "\n").encode("ascii")
+
+    device.add_file("/RMBL_ALL.csv", csv(0, rows * 5))
+    device.add_file("/RMBL_ENV_DATA_TEMP_DATA2.csv", csv(1, rows))
+    for day in range(log_files):
+        device.add_file(f"/LOGS/2024-01-{day + 1:02d}.csv", csv(day, rows))
+
+
+# ------------------ ljm-compatible front end ------------------ #
+
+class SimulatedLJM:
+    """
+    Drop-in replacement for the `labjack.ljm` module backed by SimDevices.
+
+    latency          seconds added to every device transaction
+    bandwidth        link speed in bytes/s (None = unlimited)
+    connect_latency  seconds added to openS
+    error_rate       probability that a transaction fails with
+                     LJME_NO_RESPONSE_BYTES_RECEIVED before reaching the device
+    auto_create      openS on an unknown identifier creates a demo device
+    """
+
+    LJMError = LJMError
+    constants = constants
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        connect_latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        auto_create: bool = True,
+    ):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.connect_latency = connect_latency
+        self.error_rate = error_rate
+        self.auto_create = auto_create
+        self.devices: Dict[str, SimDevice] = {}
+        self._handles: Dict[int, SimDevice] = {}
+        self._next_handle = 1
+        self._injected: List[Tuple[Optional[str], int]] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # ---- simulator control ---- #
+
+    def add_device(self, identifier: str, populate: bool = True, **kwargs) -> SimDevice:
+        """
+        Create (or replace) the device answering to identifier.
+        """
+        serial = 470000000 + zlib.crc32(identifier.encode()) % 1000000
+        ip = _ip_to_number(identifier) if _looks_like_ip(identifier) else (
+            _ip_to_number("192.168.1.4") if identifier == "ANY"
+            else _ip_to_number("10.0.0.0") + serial % 65000
+        )
+        device = SimDevice(identifier, serial, ip, **kwargs)
+        if populate:
+            populate_demo_card(device)
+        with self._lock:
+            self.devices[identifier] = device
+        return device
+
+    def inject_error(self, name: Optional[str] = None, code: int = LJME_NO_RESPONSE_BYTES_RECEIVED,
+                     count: int = 1):
+        """
+        Fail the next `count` transactions touching register `name`
+        (any register if None) with LJMError(code).
+        """
+        with self._lock:
+            self._injected.extend([(name, code)] * count)
+
+    # ---- transaction plumbing ---- #
+
+    def _device(self, handle: int) -> SimDevice:
+        device = self._handles.get(handle)
+        if device is None:
+            raise LJMError(LJME_INVALID_HANDLE, errorString="LJME_INVALID_HANDLE")
+        return device
+
+    def _maybe_fail(self, names: List[str]):
+        with self._lock:
+            for i, (name, code) in enumerate(self._injected):
+                if name is None or name in names:
+                    del self._injected[i]
+                    raise LJMError(code, errorString=f"Injected error on {names[0]}")
+            if self.error_rate and self._random.random() < self.error_rate:
+                raise LJMError(LJME_NO_RESPONSE_BYTES_RECEIVED,
+                               errorString="LJME_NO_RESPONSE_BYTES_RECEIVED")
+
+    def _transact(self, handle: int, names: List[str], payload_bytes: int, fn):
+        """
+        Run fn(device) as one packet exchange, applying the link model.
+        The device lock is held for the whole exchange, like a real handle.
+        """
+        device = self._device(handle)
+        with device.lock:
+            delay = self.latency
+            if self.bandwidth:
+                delay += (PACKET_HEADER_BYTES * 2 + payload_bytes) / self.bandwidth
+            if delay:
+                time.sleep(delay)
+            self._maybe_fail(names)
+            return fn(device)
+
+    # ---- ljm API ---- #
+
+    def openS(self, deviceType: str = "ANY", connectionType: str = "ANY",
+              identifier: str = "ANY") -> int:
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        with self._lock:
+            device = self.devices.get(identifier)
+            if device is None and identifier == "ANY" and self.devices:
+                device = next(iter(self.devices.values()))
+        if device is None:
+            if not self.auto_create:
+                raise LJMError(LJME_DEVICE_NOT_FOUND, errorString="LJME_DEVICE_NOT_FOUND")
+            device = self.add_device(identifier)
+        with self._lock:
+            handle = self._next_handle
+            self._next_handle += 1
+            self._handles[handle] = device
+        return handle
+
+    def close(self, handle: int):
+        with self._lock:
+            self._handles.pop(handle, None)
+
+    def closeAll(self):
+        with self._lock:
+            self._handles.clear()
+
+    def getHandleInfo(self, handle: int) -> Tuple[int, int, int, int, int, int]:
+        d = self._device(handle)
+        return (constants.dtT7, constants.ctETHERNET, d.serial, d.ip, 502, d.max_bytes_per_mb)
+
+    @staticmethod
+    def numberToIP(number: int) -> str:
+        return ".".join(str((int(number) >> s) & 0xFF) for s in (24, 16, 8, 0))
+
+    @staticmethod
+    def ipToNumber(ip: str) -> int:
+        return _ip_to_number(ip)
+
+    def eReadName(self, handle: int, name: str) -> float:
+        return self._transact(handle, [name], VALUE_BYTES, lambda d: d.read(name))
+
+    def eWriteName(self, handle: int, name: str, value: float):
+        self._transact(handle, [name], VALUE_BYTES, lambda d: d.write(name, value))
+
+    def eReadNames(self, handle: int, numFrames: int, aNames) -> List[float]:
+        names = list(aNames)[:numFrames]
+        return self._transact(
+            handle, names, VALUE_BYTES * numFrames, lambda d: [d.read(n) for n in names]
+        )
+
+    def eWriteNames(self, handle: int, numFrames: int, aNames, aValues):
+        names, values = list(aNames)[:numFrames], list(aValues)[:numFrames]
+
+        def run(d):
+            for n, v in zip(names, values):
+                d.write(n, v)
+
+        self._transact(handle, names, VALUE_BYTES * numFrames, run)
+
+    def eNames(self, handle: int, numFrames: int, aNames, aWrites, aNumValues, aValues):
+        names = list(aNames)[:numFrames]
+
+        def run(d):
+            out, pos = [], 0
+            for name, is_write, count in zip(names, aWrites, aNumValues):
+                values = list(aValues[pos:pos + count])
+                pos += count
+                if is_write == constants.WRITE:
+                    for v in values:
+                        d.write(name, v)
+                    out.extend(values)
+                else:
+                    out.extend(d.read(name) for _ in range(count))
+            return out
+
+        return self._transact(handle, names, VALUE_BYTES * sum(aNumValues[:numFrames]), run)
+
+    def namesToAddresses(self, numFrames: int, aNames, aNumRegisters=None):
+        addresses, data_types = [], []
+        for name in list(aNames)[:numFrames]:
+            if name not in ADDRESS_MAP:
+                raise LJMError(LJME_INVALID_NAME, errorString=f"LJME_INVALID_NAME: {name}")
+            address, data_type = ADDRESS_MAP[name]
+            addresses.append(address)
+            data_types.append(data_type)
+        return addresses, data_types
+
+    @staticmethod
+    def _names_at(addresses) -> List[str]:
+        names = []
+        for address in addresses:
+            if address not in NAME_AT_ADDRESS:
+                raise LJMError(LJME_INVALID_NAME, errorAddress=address,
+                               errorString=f"Invalid address {address}")
+            names.append(NAME_AT_ADDRESS[address])
+        return names
+
+    def eReadAddress(self, handle: int, address: int, dataType: int) -> float:
+        return self.eReadName(handle, self._names_at([address])[0])
+
+    def eWriteAddress(self, handle: int, address: int, dataType: int, value: float):
+        self.eWriteName(handle, self._names_at([address])[0], value)
+
+    def eReadAddresses(self, handle: int, numFrames: int, aAddresses, aDataTypes) -> List[float]:
+        return self.eReadNames(handle, numFrames, self._names_at(list(aAddresses)[:numFrames]))
+
+    def eWriteAddresses(self, handle: int, numFrames: int, aAddresses, aDataTypes, aValues):
+        self.eWriteNames(handle, numFrames, self._names_at(list(aAddresses)[:numFrames]), aValues)
+
+    def eReadNameByteArray(self, handle: int, name: str, numBytes: int) -> List[int]:
+        return self._transact(handle, [name], numBytes, lambda d: d.read_bytes(name, numBytes))
+
+    def eReadNameByteArrayInto(self, handle: int, name: str, buffer):
+        """
+        Buffer-filling variant of eReadNameByteArray (see backend.read_name_byte_array_into).
+        """
+        view = memoryview(buffer).cast("B")
+        self._transact(handle, [name], len(view), lambda d: d.read_bytes_into(name, view))
+
+    def eWriteNameByteArray(self, handle: int, name: str, numBytes: int, aBytes):
+        self._transact(handle, [name], numBytes,
+                       lambda d: d.write_bytes(name, numBytes, aBytes))
+
+
+def _looks_like_ip(text: str) -> bool:
+    return bool(re.match(r"^\d{1,3}(\.\d{1,3}){3}$", text))
+
+
+def _ip_to_number(ip: str) -> int:
+    a, b, c, d = (int(x) for x in ip.split("."))
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+_default: Optional[SimulatedLJM] = None
+_default_lock = threading.Lock()
+
+
+def default_simulator() -> SimulatedLJM:
+    """
+    Process-wide simulator shared by every backend="sim" connection, so
+    reconnecting to the same identifier sees the same card.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = SimulatedLJM()
+        return _default
@@ -1,7 +1,20 @@
 # t7sd_api/user_ram.py
 
 from __future__ import annotations
-from labjack import ljm
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+from .backend import ljm
+from .instrument import operation
+from .modbus import ModbusInterface
+
+# type -> (base address, registers per slot, slot count, LJM data type, array typecode)
+USER_RAM_LAYOUT = {
+    "F32": (46000, 2, 40, "FLOAT32", "f"),
+    "I32": (46080, 2, 10, "INT32", "i"),
+    "U32": (46100, 2, 40, "UINT32", "I"),
+    "U16": (46180, 1, 20, "UINT16", "H"),
+}
 
 
 class UserRAMInterface:
@@ -9,29 +22,86 @@ class UserRAMInterface:
     USER_RAM access helpers for all supported types.
     """
 
-    def __init__(self, handle: int):
+    def __init__(self, handle: int, lj: Any = ljm, modbus: Optional[ModbusInterface] = None):
         self.handle = handle
+        self.ljm = lj
+        self.modbus = modbus if modbus is not None else ModbusInterface(handle, lj=lj)
+
+        # Precomputed per-slot addresses and data types for block transfers
+        self._addresses: Dict[str, List[int]] = {}
+        self._data_types: Dict[str, List[int]] = {}
+        for dtype, (base, stride, count, ljm_type, _) in USER_RAM_LAYOUT.items():
+            self._addresses[dtype] = [base + stride * i for i in range(count)]
+            self._data_types[dtype] = [getattr(lj.constants, ljm_type)] * count
+
+    def _block_range(self, dtype: str, start: int, count: int) -> slice:
+        if dtype not in USER_RAM_LAYOUT:
+            raise ValueError(
+                f"Unknown USER_RAM type '{dtype}' (expected one of {', '.join(USER_RAM_LAYOUT)})."
+            )
+        slots = USER_RAM_LAYOUT[dtype][2]
+        if start < 0 or count < 0 or start + count > slots:
+            raise ValueError(f"USER_RAM {dtype} range {start}..{start + count - 1} "
+                             f"is outside 0..{slots - 1}.")
+        return slice(start, start + count)
+
+    @operation("user_ram.read_block")
+    def read_block(self, dtype: str, start: int = 0, count: Optional[int] = None) -> array:
+        """
+        Read `count` consecutive slots of one type (all remaining slots if
+        None) in a single multi-register transaction.
+        Returns an array.array; use numpy.frombuffer(result, ...) for NumPy.
+        """
+        if count is None:
+            count = USER_RAM_LAYOUT.get(dtype, (0, 0, 0))[2] - start
+        block = self._block_range(dtype, start, count)
+        values = self.modbus.read_addresses(
+            self._addresses[dtype][block], self._data_types[dtype][block]
+        )
+        typecode = USER_RAM_LAYOUT[dtype][4]
+        if typecode != "f":
+            values = [int(v) for v in values]
+        return array(typecode, values)
+
+    @operation("user_ram.write_block")
+    def write_block(self, dtype: str, start: int, values: Sequence[float]):
+        """
+        Write consecutive slots of one type, starting at `start`, in a single
+        multi-register transaction.
+        """
+        block = self._block_range(dtype, start, len(values))
+        self.modbus.write_addresses(
+            self._addresses[dtype][block], self._data_types[dtype][block], list(values)
+        )
 
+    @operation("user_ram.read_f32")
     def read_f32(self, index: int) -> float:
-        return ljm.eReadName(self.handle, f"USER_RAM{index}_F32")
+        return self.ljm.eReadName(self.handle, f"USER_RAM{index}_F32")
 
+    @operation("user_ram.write_f32")
     def write_f32(self, index: int, value: float):
-        ljm.eWriteName(self.handle, f"USER_RAM{index}_F32", value)
+        self.ljm.eWriteName(self.handle, f"USER_RAM{index}_F32", value)
 
+    @operation("user_ram.read_i32")
     def read_i32(self, index: int) -> int:
-        return int(ljm.eReadName(self.handle, f"USER_RAM{index}_I32"))
+        return int(self.ljm.eReadName(self.handle, f"USER_RAM{index}_I32"))
 
+    @operation("user_ram.write_i32")
     def write_i32(self, index: int, value: int):
-        ljm.eWriteName(self.handle, f"USER_RAM{index}_I32", value)
+        self.ljm.eWriteName(self.handle, f"USER_RAM{index}_I32", value)
 
+    @operation("user_ram.read_u32")
     def read_u32(self, index: int) -> int:
-        return int(ljm.eReadName(self.handle, f"USER_RAM{index}_U32"))
+        return int(self.ljm.eReadName(self.handle, f"USER_RAM{index}_U32"))
 
+    @operation("user_ram.write_u32")
     def write_u32(self, index: int, value: int):
-        ljm.eWriteName(self.handle, f"USER_RAM{index}_U32", value)
+        self.ljm.eWriteName(self.handle, f"USER_RAM{index}_U32", value)
 
+    @operation("user_ram.read_u16")
     def read_u16(self, index: int) -> int:
-        return int(ljm.eReadName(self.handle, f"USER_RAM{index}_U16"))
+        return int(self.ljm.eReadName(self.handle, f"USER_RAM{index}_U16"))
 
+    @operation("user_ram.write_u16")
     def write_u16(self, index: int, value: int):
-        ljm.eWriteName(self.handle, f"USER_RAM{index}_U16", value)
+        self.ljm.eWriteName(self.handle, f"USER_RAM{index}_U16", value)
@@ -1,13 +1,20 @@
 import argparse
-import shlex
+import contextlib
+import csv
+import posixpath
 import os
 import sys
 import threading
+import time
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from t7sd_api import LabJackSD
+from t7sd_api import DevicePool, LabJackSD, format_stats
 
+from t7sd_shell.batch_log import CONSOLE_MODES, LOG_FORMATS, BatchLog
+from t7sd_shell.batch_plan import CONNECT_STEP, BatchPlan, compile_plan, step_record
+from t7sd_shell.batch_results import RESULT_FORMATS, ResultsWriter
+from t7sd_shell.batch_procs import run_sharded
 from t7sd_shell.command_registry import CommandRegistry
 from t7sd_shell.commands.sd_commands import register_sd_commands
 from t7sd_shell.commands.modbus_commands import register_modbus_commands
@@ -35,95 +42,298 @@ def load_lines(path):
             yield stripped
 
 
+# -------------------------------------------------------
+# Build the registry exactly like the shell
+# -------------------------------------------------------
+def build_registry():
+    registry = CommandRegistry()
+    register_sd_commands(registry)
+    register_modbus_commands(registry)
+    register_ef_commands(registry)
+    register_user_ram_commands(registry)
+    register_system_commands(registry)
+    return registry
+
+
 # -------------------------------------------------------
 # Connect helper
 # -------------------------------------------------------
-def connect_device(identifier):
+def connect_device(identifier, instrument=False, backend="ljm", index=None, index_max_age=None):
+    """
+    (device, None) on success, else (None, the exception).
+    """
     try:
-        return LabJackSD.connect(identifier=identifier, quiet=True)
+        dev = LabJackSD.connect(identifier=identifier, quiet=True, instrument=instrument,
+                                backend=backend, index=index)
     except Exception as e:
         print(f"❌ Could not connect to {identifier}: {e}")
-        return None
+        return None, e
+    # Trust indexed listings this young instead of listing the card again
+    dev.sd.index_max_age = index_max_age
+    return dev, None
+
+
+def checkout_device(identifier, pool=None, instrument=False, backend="ljm", index=None,
+                    index_max_age=None):
+    """
+    Get a device from the pool (warm connection) or, without a pool, open one.
+    Returns (device, None), or (None, the exception) if it could not connect.
+    """
+    if pool is None:
+        return connect_device(identifier, instrument=instrument, backend=backend,
+                              index=index, index_max_age=index_max_age)
+    try:
+        dev = pool.acquire(identifier)
+    except Exception as e:
+        print(f"❌ Could not connect to {identifier}: {e}")
+        return None, e
+    dev.sd.index_max_age = index_max_age
+    return dev, None
+
+
+def checkin_device(dev, pool=None, healthy=True):
+    if pool is None:
+        dev.close()
+    else:
+        pool.release(dev, healthy)
 
 
 # -------------------------------------------------------
 # Single device execution
 # -------------------------------------------------------
-def run_commands_on_device(identifier, commands, registry, log_dir=None, stop_on_error=False):
+def run_commands_on_device(identifier, commands, registry, log_dir=None, stop_on_error=False,
+                           stats_out=None, backend="ljm", index=None, index_max_age=None,
+                           pool=None, batch_log=None, on_step=None):
     """
-    Executes a list of commands on a single device.
+    Executes a compiled BatchPlan (or a list of command lines, compiled on
+    the fly) on a single device.
     Returns True if all succeeded, False otherwise.
+    If stats_out is a dict, the device's LJM statistics are stored in it.
+    index/index_max_age control the persistent SD index (see LabJackDevice.connect).
+    With a DevicePool the connection is borrowed and returned instead of
+    opened and closed (the pool's own backend/index settings then apply).
+    With a BatchLog everything the device prints goes through it and
+    log_dir is ignored. on_step receives a result record per executed step
+    (and one for connecting); see batch_plan.step_record.
     """
-    dev = connect_device(identifier)
-    if dev is None:
-        return False
-
-    # per-device logger
-    log_path = None
-    log_file = None
-
-    if log_dir:
-        os.makedirs(log_dir, exist_ok=True)
-        log_dir = add_trailing_slash_os(log_dir)
-        log_path = os.path.join(log_dir, f"{identifier}.log")
-        log_file = open(log_path, "a", encoding="utf-8")
-
-        def log(msg):
-            now = datetime.now()
-            formatted_datetime = now.strftime('%Y-%m-%d %H:%M:%S')
-            print(formatted_datetime, msg)
-            log_file.write(formatted_datetime + " " + msg + "\n")
-        print(f"=== DEVICE {identifier} START ===")
-        log_file.write(f"=== DEVICE {identifier} START ===\n")
+    plan = commands if isinstance(commands, BatchPlan) else compile_plan(commands, registry)
+
+    if batch_log is None:
+        capture = contextlib.nullcontext()
     else:
-        log = print
+        capture = batch_log.capture(identifier)
+    with capture:
+        start = time.time()
+        dev, error = checkout_device(identifier, pool,
+                                     instrument=stats_out is not None or on_step is not None,
+                                     backend=backend, index=index, index_max_age=index_max_age)
+        if on_step is not None:
+            on_step(step_record(dev, identifier, CONNECT_STEP, start, None, error))
+        if dev is None:
+            return False
+        if pool is not None:
+            # Pooled connections keep their stats; report this run only
+            dev.reset_stats()
+
+        if batch_log is None:
+            log, log_file = open_device_log(identifier, log_dir)
+        else:
+            batch_log.start(identifier)
+            log, log_file = print, None
+
+        success = plan.run(dev, identifier, log, stop_on_error, on_step)
+
+        device_stats = None
+        if stats_out is not None:
+            device_stats = stats_out[identifier] = dev.stats()
+        if batch_log is None:
+            close_device_log(identifier, log_file, device_stats)
+        else:
+            batch_log.end(identifier, device_stats)
+
+        checkin_device(dev, pool, healthy=success)
+    return success
 
-    success = True
 
-    for line in commands:
-        # variable substitution
-        line_resolved = line.replace("$DEVICE", identifier)
+def open_device_log(identifier, log_dir=None):
+    """
+    Return (log function, log file or None) for one device's run.
+    """
+    if not log_dir:
+        return print, None
+
+    os.makedirs(log_dir, exist_ok=True)
+    log_dir = add_trailing_slash_os(log_dir)
+    log_path = os.path.join(log_dir, f"{identifier}.log")
+    log_file = open(log_path, "a", encoding="utf-8")
+
+    def log(msg):
+        now = datetime.now()
+        formatted_datetime = now.strftime('%Y-%m-%d %H:%M:%S')
+        print(formatted_datetime, msg)
+        log_file.write(formatted_datetime + " " + msg + "\n")
+    print(f"=== DEVICE {identifier} START ===")
+    log_file.write(f"=== DEVICE {identifier} START ===\n")
+    return log, log_file
+
+
+def close_device_log(identifier, log_file, stats=None):
+    if log_file is None:
+        return
+    if stats is not None:
+        log_file.write(format_stats(stats) + "\n")
+    log_file.write(f"=== DEVICE {identifier} END ===\n\n")
+    log_file.close()
 
-        log(f" -> {line_resolved}")
 
-        # parse command + args
-        try:
-            parts = shlex.split(line_resolved)
-        except Exception as e:
-            log(f"Parse error: {e}")
-            if stop_on_error:
-                success = False
-                break
-            else:
-                continue
+# -------------------------------------------------------
+# Per-device LJM statistics summary
+# -------------------------------------------------------
+def print_stats_summary(stats):
+    print("\n" + "=" * 60)
+    print("LJM STATISTICS")
+    print("=" * 60)
+    for identifier in sorted(stats, key=lambda i: stats[i]["round_trips"], reverse=True):
+        print(f"\n--- {identifier} ---")
+        print(format_stats(stats[identifier], limit=5))
 
-        if not parts:
-            continue
 
-        cmd, *args = parts
+# -------------------------------------------------------
+# Run the command script on every device
+# -------------------------------------------------------
+def run_batch(devices, commands, registry, args, stats, pool=None, batch_log=None, results=None):
+    plan = commands if isinstance(commands, BatchPlan) else compile_plan(
+        commands, registry, coalesce=not args.no_coalesce
+    )
+    print(f"🌐 Running {len(plan)} commands ({plan.transactions()} steps) for {len(devices)} devices\n")
 
-        if cmd not in registry.commands:
-            log(f"Unknown command '{cmd}'")
-            if stop_on_error:
-                success = False
-                break
-            continue
+    def report(identifier, ok, message):
+        if batch_log is None:
+            print(message)
+        else:
+            batch_log.result(identifier, ok, message)
 
-        # execute
-        try:
-            registry.commands[cmd](dev, args)
-        except Exception as e:
-            log(f"❌ Error executing '{line_resolved}': {e}")
-            success = False
-            if stop_on_error:
-                break
+    if args.parallel <= 1:
+        # sequential mode
+        for identifier in devices:
+            if batch_log is None:
+                print("=" * 60)
+                print(f"DEVICE {identifier}")
+                print("=" * 60)
+            ok = run_commands_on_device(
+                identifier, plan, registry,
+                log_dir=args.log_dir,
+                stop_on_error=args.stop_on_error,
+                stats_out=stats,
+                backend=args.backend,
+                index=args.index,
+                index_max_age=args.index_max_age,
+                pool=pool,
+                batch_log=batch_log,
+                on_step=results.record if results is not None else None
+            )
+            if batch_log is not None:
+                report(identifier, ok, f"✔  {identifier} completed successfully" if ok
+                       else f"❌ {identifier} had errors")
+    else:
+        # parallel mode
+        print(f"⚡ Executing in parallel with {args.parallel} workers\n")
+        with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+            futures = {
+                executor.submit(
+                    run_commands_on_device,
+                    identifier, plan, registry,
+                    args.log_dir,
+                    args.stop_on_error,
+                    stats,
+                    args.backend,
+                    args.index,
+                    args.index_max_age,
+                    pool,
+                    batch_log,
+                    results.record if results is not None else None
+                ): identifier
+                for identifier in devices
+            }
 
-    if log_file:
-        log_file.write(f"=== DEVICE {identifier} END ===\n\n")
-        log_file.close()
+            for future in as_completed(futures):
+                identifier = futures[future]
+                try:
+                    ok = future.result()
+                    if ok:
+                        report(identifier, True, f"✔  {identifier} completed successfully")
+                    else:
+                        report(identifier, False, f"❌ {identifier} had errors")
+                except Exception as e:
+                    report(identifier, False, f"❌ {identifier} crashed: {e}")
 
-    dev.close()
-    return success
+
+# -------------------------------------------------------
+# Fleet inventory: walk every card, one combined CSV
+# -------------------------------------------------------
+INVENTORY_FIELDS = ["device", "path", "type", "size"]
+
+
+def inventory_device(identifier, writer, write_lock, top="/", backend="ljm", index=None,
+                     pool=None):
+    """
+    Walk one device's SD card from `top`, appending a CSV row per entry as each
+    directory is listed. Returns (files, bytes), or None if it could not connect.
+    """
+    dev, _ = checkout_device(identifier, pool, backend=backend, index=index)
+    if dev is None:
+        return None
+
+    def on_error(path, exc):
+        print(f"❌ {identifier}: could not list '{path}': {exc}")
+
+    files = total = 0
+    try:
+        for dir_path, listing in dev.sd.walk(top, onerror=on_error, compact=True):
+            rows = []
+            for i, name in enumerate(listing.names()):
+                size = listing.sizes[i]
+                kind = "dir" if listing.is_dir(i) else "file" if listing.is_file(i) else "other"
+                rows.append([identifier, posixpath.join(dir_path, name), kind, size])
+                if kind == "file":
+                    files += 1
+                    total += size
+            with write_lock:
+                writer.writerows(rows)
+    except Exception:
+        checkin_device(dev, pool, healthy=False)
+        raise
+    checkin_device(dev, pool)
+    return files, total
+
+
+def write_inventory(devices, path, parallel=1, top="/", backend="ljm", index=None, pool=None):
+    """
+    Walk all devices concurrently (up to `parallel` at a time) into one CSV.
+    """
+    print(f"🗂  Writing SD inventory of {len(devices)} devices to {path}\n")
+    write_lock = threading.Lock()
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(INVENTORY_FIELDS)
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+            futures = {
+                executor.submit(inventory_device, identifier, writer, write_lock,
+                            top, backend, index, pool): identifier
+                for identifier in devices
+            }
+
+            for future in as_completed(futures):
+                identifier = futures[future]
+                try:
+                    result = future.result()
+                    if result is None:
+                        print(f"❌ {identifier} skipped (no connection)")
+                    else:
+                        print(f"✔  {identifier}: {result[0]} files, {result[1]} bytes")
+                except Exception as e:
+                    print(f"❌ {identifier} inventory failed: {e}")
 
 
 # -------------------------------------------------------
@@ -135,10 +345,29 @@ def main():
     )
 
     parser.add_argument("--devices", required=True, help="File containing device identifiers")
-    parser.add_argument("--commands", required=True, help="Command script file")
+    parser.add_argument("--commands", default=None, help="Command script file")
     parser.add_argument("--parallel", type=int, default=1, help="Number of devices to run in parallel")
     parser.add_argument("--log-dir", default=None, help="Optional directory for per-device logs")
+    parser.add_argument("--log-format", default="text", choices=LOG_FORMATS, help="'jsonl' writes one structured batch.jsonl in --log-dir instead of per-device .log files")
+    parser.add_argument("--console", default="full", choices=CONSOLE_MODES, help="Console output: every line, per-device results only, or nothing")
     parser.add_argument("--stop-on-error", action="store_true", help="Stop execution for a device on first error")
+    parser.add_argument("--results", default=None, help="Write one row per executed command (timing, round trips, bytes, error) to this CSV/JSONL file and print a latency summary")
+    parser.add_argument("--results-format", default=None, choices=RESULT_FORMATS, help="Format for --results (default: from the file extension, else csv)")
+    parser.add_argument("--stats", action="store_true", help="Print per-device LJM round-trip/latency statistics at the end")
+    parser.add_argument("--backend", default="ljm", choices=["ljm", "sim"], help="'sim' runs against the in-process T7 simulator")
+    parser.add_argument("--index", action="store_true", help="Read/write the persistent SD listing index (~/.t7sd/index)")
+    parser.add_argument("--inventory", default=None, help="Walk every device's SD card and write a combined CSV inventory here")
+    parser.add_argument("--inventory-root", default="/", help="Directory to walk for --inventory (default /)")
+    parser.add_argument("--index-max-age", type=float, default=None, help="With --index, use indexed SD listings up to this many seconds old instead of listing again")
+    parser.add_argument("--repeat", type=int, default=1, help="Run the job this many times, reusing open connections")
+    parser.add_argument("--interval", type=float, default=60.0, help="Seconds between --repeat runs")
+    parser.add_argument("--no-coalesce", action="store_true", help="Run every register command as its own transaction instead of merging consecutive ones")
+    parser.add_argument("--processes", type=int, default=1, help="Shard devices across this many worker processes (each with --parallel threads)")
+    parser.add_argument("--device-timeout", type=float, default=None, help="With --processes: fail a device (and restart its worker) after this many seconds")
+    parser.add_argument("--engine", default="threads", choices=["threads", "async"], help="'async' runs devices as coroutines on one event loop")
+    parser.add_argument("--concurrency", type=int, default=None, help="With --engine async: devices in flight at once (default 1000)")
+    parser.add_argument("--threads", type=int, default=None, help="With --engine async: executor threads doing LJM work (default 8)")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="Close pooled connections idle for this many seconds")
 
     args = parser.parse_args()
 
@@ -147,56 +376,91 @@ def main():
         print("No devices found.")
         return
 
-    commands = list(load_lines(args.commands))
-    if not commands:
+    commands = list(load_lines(args.commands)) if args.commands else []
+    if not commands and not args.inventory:
         print("No commands found.")
         return
 
-    # Build the registry exactly like the shell
-    registry = CommandRegistry()
-    register_sd_commands(registry)
-    register_modbus_commands(registry)
-    register_ef_commands(registry)
-    register_user_ram_commands(registry)
-    register_system_commands(registry)
+    if args.device_timeout is not None and args.processes <= 1:
+        # A thread stuck in an LJM call cannot be stopped; a process can
+        print("--device-timeout requires --processes 2 or more.")
+        return
 
-    print(f"🌐 Running {len(commands)} commands for {len(devices)} devices\n")
+    if args.engine == "async" and args.processes > 1:
+        print("--engine async and --processes cannot be combined.")
+        return
 
-    if args.parallel <= 1:
-        # sequential mode
-        for identifier in devices:
-            print("=" * 60)
-            print(f"DEVICE {identifier}")
-            print("=" * 60)
-            run_commands_on_device(
-                identifier, commands, registry,
-                log_dir=args.log_dir,
-                stop_on_error=args.stop_on_error
-            )
-    else:
-        # parallel mode
-        print(f"⚡ Executing in parallel with {args.parallel} workers\n")
-        with ThreadPoolExecutor(max_workers=args.parallel) as pool:
-            futures = {
-                pool.submit(
-                    run_commands_on_device,
-                    identifier, commands, registry,
-                    args.log_dir,
-                    args.stop_on_error
-                ): identifier
-                for identifier in devices
-            }
+    if args.engine != "async" and (args.concurrency is not None or args.threads is not None):
+        print("--concurrency and --threads require --engine async.")
+        return
 
-            for future in as_completed(futures):
-                identifier = futures[future]
-                try:
-                    ok = future.result()
-                    if ok:
-                        print(f"✔  {identifier} completed successfully")
-                    else:
-                        print(f"❌ {identifier} had errors")
-                except Exception as e:
-                    print(f"❌ {identifier} crashed: {e}")
+    if args.index_max_age is not None and not args.index:
+        print("--index-max-age requires --index.")
+        return
+
+    stats = {} if args.stats else None
+    registry = build_registry()
+
+    # Parse the script once for the whole fleet and every repeat; consecutive
+    # register lines are merged into multi-frame transactions
+    plan = compile_plan(commands, registry, coalesce=not args.no_coalesce) if commands else None
+
+    # Keep one warm connection per device only if a later phase or repeat
+    # will reuse it; a single pass opens and closes each device in turn so a
+    # large fleet never holds every handle open at once. Sharded runs connect
+    # in their worker processes and leave the pool to the inventory phase.
+    phases = (plan is not None and args.processes <= 1) + bool(args.inventory)
+    pool = None
+    if phases * max(1, args.repeat) > 1:
+        pool = DevicePool(
+            backend=args.backend,
+            idle_timeout=args.idle_timeout,
+            instrument=stats is not None or args.results is not None,
+            index=args.index
+        )
+    results = ResultsWriter(args.results, args.results_format) if args.results else None
+    # Device output is queued to one writer thread (files and console)
+    batch_log = BatchLog(args.log_dir, console=args.console, fmt=args.log_format)
+    try:
+        for run in range(max(1, args.repeat)):
+            if run:
+                time.sleep(args.interval)
+                print(f"\n🔁 Run {run + 1}/{args.repeat}\n")
+
+            if plan is not None and args.processes > 1:
+                run_sharded(devices, commands, args, stats, batch_log, results)
+            elif plan is not None and args.engine == "async":
+                # Imported lazily: batch_async builds on this module
+                from t7sd_shell.batch_async import run_batch_async
+                run_batch_async(devices, plan, args, stats, pool, batch_log, results)
+            elif plan is not None:
+                run_batch(devices, plan, registry, args, stats, pool, batch_log, results)
+
+            if args.inventory:
+                write_inventory(
+                    devices, args.inventory,
+                    parallel=args.parallel,
+                    top=args.inventory_root,
+                    backend=args.backend,
+                    index=args.index,
+                    pool=pool
+                )
+            batch_log.flush()
+    finally:
+        if pool is not None:
+            pool.close_all()
+        batch_log.close()
+        if results is not None:
+            results.close()
+
+    if stats:
+        print_stats_summary(stats)
+
+    if results is not None:
+        print("\n" + "=" * 60)
+        print(f"COMMAND TIMING ({results.path})")
+        print("=" * 60)
+        print(results.summary())
 
 
 if __name__ == "__main__":
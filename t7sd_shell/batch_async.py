@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from t7sd_shell.batch import checkin_device, checkout_device
+from t7sd_shell.batch_plan import CONNECT_STEP, step_record
+
+# Executor threads shared by all devices in the async engine.
+DEFAULT_ASYNC_THREADS = 8
+
+# Devices in flight at once in the async engine (--concurrency); each only
+# holds a connection and a coroutine, not a thread.
+DEFAULT_ASYNC_CONCURRENCY = 1000
+
+
+async def run_device_async(identifier, plan, args, stats, pool, semaphore, call, batch_log,
+                           results=None):
+    """
+    One device's command sequence as a coroutine. Connecting and each plan
+    step are blocking LJM work and go through call() (the shared executor);
+    between steps the device holds no thread.
+    """
+    async def device_call(fn, *a, **kw):
+        # Whatever the step prints belongs to this device's log
+        return await call(batch_log.bind(identifier, fn), *a, **kw)
+
+    on_step = results.record if results is not None else None
+
+    async with semaphore:
+        start = time.time()
+        dev, error = await device_call(
+            checkout_device, identifier, pool,
+            instrument=stats is not None or on_step is not None,
+            backend=args.backend,
+            index=args.index,
+            index_max_age=args.index_max_age,
+        )
+        if on_step is not None:
+            on_step(step_record(dev, identifier, CONNECT_STEP, start, None, error))
+        if dev is None:
+            return False
+        if pool is not None:
+            dev.reset_stats()
+
+        batch_log.start(identifier)
+        success = False
+        try:
+            success = await plan.run_async(
+                dev, identifier, print, device_call, args.stop_on_error, on_step
+            )
+        finally:
+            device_stats = None
+            if stats is not None:
+                device_stats = stats[identifier] = dev.stats()
+            batch_log.end(identifier, device_stats)
+            await device_call(checkin_device, dev, pool, success)
+        return success
+
+
+async def _run_all(devices, plan, args, stats, pool, threads, batch_log, results):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(_concurrency(args))
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="t7sd-batch") as executor:
+        async def call(fn, *a, **kw):
+            return await loop.run_in_executor(executor, functools.partial(fn, *a, **kw))
+
+        async def run_one(identifier):
+            try:
+                ok = await run_device_async(
+                    identifier, plan, args, stats, pool, semaphore, call, batch_log, results
+                )
+            except Exception as e:
+                batch_log.result(identifier, False, f"❌ {identifier} crashed: {e}")
+                return
+            if ok:
+                batch_log.result(identifier, True, f"✔  {identifier} completed successfully")
+            else:
+                batch_log.result(identifier, False, f"❌ {identifier} had errors")
+
+        await asyncio.gather(*(run_one(identifier) for identifier in devices))
+
+
+def _concurrency(args):
+    return max(1, args.concurrency or DEFAULT_ASYNC_CONCURRENCY)
+
+
+def run_batch_async(devices, plan, args, stats, pool, batch_log, results=None):
+    """
+    --engine async: one event loop, at most args.concurrency devices in
+    flight (a semaphore, so thousands are fine) and args.threads executor
+    threads doing the blocking LJM work for all of them. Output goes through
+    batch_log.
+    """
+    threads = max(1, args.threads or DEFAULT_ASYNC_THREADS)
+    print(f"🌐 Running {len(plan)} commands ({plan.transactions()} steps) for {len(devices)} devices")
+    print(f"⚡ asyncio engine: up to {_concurrency(args)} devices in flight on {threads} threads\n")
+    asyncio.run(_run_all(devices, plan, args, stats, pool, threads, batch_log, results))
@@ -0,0 +1,277 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from t7sd_api import format_stats
+
+# Per-device log files kept open at once; the least recently written is closed.
+DEFAULT_MAX_OPEN_FILES = 64
+
+# Most records written per batch; the writer drains the queue up to this.
+WRITE_BATCH = 1024
+
+# Seconds the writer waits for more records before flushing what it has.
+FLUSH_INTERVAL = 0.2
+
+CONSOLE_MODES = ("full", "summary", "off")
+LOG_FORMATS = ("text", "jsonl")
+
+# Combined log file used by the jsonl format.
+JSONL_FILENAME = "batch.jsonl"
+
+_STOP = object()
+
+
+# -------------------------------------------------------
+# Thread-aware stdout: route a device thread's prints
+# -------------------------------------------------------
+class ThreadStdout:
+    """
+    Stand-in for sys.stdout: complete lines printed by a thread bound to a
+    device go to emit(identifier, line). Other output goes to fallback, or
+    with no fallback to emit(None, line).
+    """
+
+    def __init__(self, emit, fallback=None):
+        self._emit = emit
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "buffer"):
+            local.identifier = None
+            local.buffer = ""
+        return local
+
+    def bind(self, identifier):
+        self.flush()
+        local = self._state()
+        local.identifier = identifier
+        local.buffer = ""
+
+    def unbind(self):
+        self.flush()
+        self._state().identifier = None
+
+    def write(self, text):
+        local = self._state()
+        if local.identifier is None and self._fallback is not None:
+            return self._fallback.write(text)
+        local.buffer += text
+        *lines, local.buffer = local.buffer.split("\n")
+        for line in lines:
+            self._emit(local.identifier, line)
+        return len(text)
+
+    def flush(self):
+        local = self._state()
+        if local.buffer and (local.identifier is not None or self._fallback is None):
+            self._emit(local.identifier, local.buffer)
+            local.buffer = ""
+        if self._fallback is not None:
+            self._fallback.flush()
+
+
+# -------------------------------------------------------
+# Batch log pipeline
+# -------------------------------------------------------
+class BatchLog:
+    """
+    Non-blocking log for batch runs. Device threads only enqueue records;
+    one writer thread drains the queue in batches, appends to per-device log
+    files held open in a bounded LRU (or to one JSONL file), and writes the
+    console in a single call per batch.
+
+    console: "full" (every line, tagged with the device), "summary" (only
+    per-device results and a final count) or "off". While the log is open,
+    output not bound to a device (e.g. pool connections closing) is queued
+    as a note: shown in full mode, never written to the log files.
+    """
+
+    def __init__(self, log_dir=None, console="full", fmt="text",
+                 max_open_files=DEFAULT_MAX_OPEN_FILES):
+        if console not in CONSOLE_MODES:
+            raise ValueError(f"console must be one of {', '.join(CONSOLE_MODES)}")
+        if fmt not in LOG_FORMATS:
+            raise ValueError(f"fmt must be one of {', '.join(LOG_FORMATS)}")
+        self.log_dir = log_dir
+        self.console = console
+        self.fmt = fmt
+        self.max_open_files = max(1, max_open_files)
+        self.succeeded = 0
+        self.failed = 0
+        self._count_lock = threading.Lock()
+
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._files = OrderedDict()   # path -> open file
+        self._console_out = sys.stdout
+        self._stdout = ThreadStdout(self.write)
+        sys.stdout = self._stdout
+        self._thread = threading.Thread(target=self._writer, name="batch-log", daemon=True)
+        self._thread.start()
+
+    # ---- producers (any thread) ---- #
+
+    def write(self, identifier, message, event="log"):
+        """
+        Queue a line for identifier's log; identifier None makes it a note.
+        """
+        if identifier is None:
+            event = "note"
+        self._queue.put((time.time(), identifier, event, message))
+
+    def start(self, identifier):
+        self.write(identifier, f"=== DEVICE {identifier} START ===", "start")
+
+    def end(self, identifier, stats=None):
+        if stats is not None:
+            self.write(identifier, stats, "stats")
+        self.write(identifier, f"=== DEVICE {identifier} END ===", "end")
+
+    def result(self, identifier, ok, message):
+        """
+        Record a device's outcome; shown on the console in full and summary modes.
+        """
+        with self._count_lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+        self.write(identifier, message, "result")
+
+    @contextmanager
+    def capture(self, identifier):
+        """
+        Send everything this thread prints inside the block to identifier's log.
+        """
+        self._stdout.bind(identifier)
+        try:
+            yield
+        finally:
+            self._stdout.unbind()
+
+    def bind(self, identifier, fn):
+        """
+        fn wrapped to run inside capture(identifier), e.g. on an executor thread.
+        """
+        def captured(*args, **kwargs):
+            with self.capture(identifier):
+                return fn(*args, **kwargs)
+        return captured
+
+    def flush(self):
+        """
+        Block until everything queued so far has been written.
+        """
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """
+        Write everything queued, close the files and restore sys.stdout.
+        """
+        if self._thread is None:
+            return
+        sys.stdout.flush()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        sys.stdout = self._console_out
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+        if self.console != "off" and self.succeeded + self.failed:
+            print(f"\n{self.succeeded} device runs succeeded, {self.failed} had errors")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- writer thread ---- #
+
+    def _writer(self):
+        stop = False
+        while not stop:
+            records = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(records) < WRITE_BATCH and records[-1] is not _STOP:
+                timeout = deadline - time.monotonic()
+                try:
+                    if timeout > 0:
+                        records.append(self._queue.get(timeout=timeout))
+                    else:
+                        records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if records[-1] is _STOP:
+                records.pop()
+                stop = True
+            flushed = [r for r in records if isinstance(r, threading.Event)]
+            try:
+                self._write_batch([r for r in records if isinstance(r, tuple)])
+            except Exception as e:
+                # Logging must never take the run down
+                self._console_out.write(f"[WARN] batch log write failed: {e}\n")
+            for done in flushed:
+                done.set()
+
+    def _write_batch(self, records):
+        files = {}     # path -> [chunks]
+        console = []
+        for ts, identifier, event, message in records:
+            if self.console == "full" and event in ("log", "result", "note"):
+                # Results already name the device; notes have none
+                console.append(f"[{identifier}] {message}\n" if event == "log" else f"{message}\n")
+            elif self.console == "summary" and event == "result":
+                console.append(f"{message}\n")
+            if not self.log_dir or event == "note":
+                continue
+            if self.fmt == "jsonl":
+                path = os.path.join(self.log_dir, JSONL_FILENAME)
+                record = {"ts": ts, "device": identifier, "event": event}
+                record["stats" if event == "stats" else "message"] = message
+                files.setdefault(path, []).append(json.dumps(record) + "\n")
+            else:
+                path = os.path.join(self.log_dir, f"{identifier}.log")
+                if event == "stats":
+                    text = format_stats(message) + "\n"
+                elif event in ("start", "end"):
+                    text = message + ("\n\n" if event == "end" else "\n")
+                else:
+                    stamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+                    text = f"{stamp} {message}\n"
+                files.setdefault(path, []).append(text)
+
+        for path, chunks in files.items():
+            self._file(path).write("".join(chunks))
+        for f in self._files.values():
+            f.flush()
+        if console:
+            self._console_out.write("".join(console))
+            self._console_out.flush()
+
+    def _file(self, path):
+        f = self._files.get(path)
+        if f is not None:
+            self._files.move_to_end(path)
+            return f
+        f = open(path, "a", encoding="utf-8")
+        self._files[path] = f
+        while len(self._files) > self.max_open_files:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        return f
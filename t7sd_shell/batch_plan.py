@@ -0,0 +1,428 @@
+import shlex
+import time
+
+from t7sd_api.user_ram import USER_RAM_LAYOUT
+
+# Placeholder replaced by the device identifier when a plan runs.
+DEVICE_VAR = "$DEVICE"
+
+
+# -------------------------------------------------------
+# Per-device variables: split once, joined per device
+# -------------------------------------------------------
+class _Template:
+    __slots__ = ("parts",)
+
+    def __init__(self, text):
+        self.parts = text.split(DEVICE_VAR)
+
+    def fill(self, identifier):
+        parts = self.parts
+        return parts[0] if len(parts) == 1 else identifier.join(parts)
+
+
+# -------------------------------------------------------
+# Plan steps
+# -------------------------------------------------------
+class CommandStep:
+    """
+    One script line dispatched through the registry, as the shell would.
+    Steps' run() returns None on success, else the exception or message.
+    """
+
+    fails_device = True
+
+    def __init__(self, line, handler, args, command):
+        self.line = _Template(line)
+        self.handler = handler
+        self.args = [_Template(a) for a in args]
+        self.command = command
+
+    def text(self, identifier):
+        return self.line.fill(identifier)
+
+    def run(self, dev, identifier, log, stop_on_error=False):
+        line = self.line.fill(identifier)
+        log(f" -> {line}")
+        try:
+            self.handler(dev, [a.fill(identifier) for a in self.args])
+        except Exception as e:
+            log(f"❌ Error executing '{line}': {e}")
+            return e
+        return None
+
+
+class ErrorStep:
+    """
+    A line that failed to compile (parse error, unknown command); reported
+    on every device like the per-line parser used to. It only fails the
+    device under --stop-on-error.
+    """
+
+    fails_device = False
+
+    def __init__(self, line, message, command):
+        self.line = _Template(line)
+        self.message = message
+        self.command = command
+
+    def text(self, identifier):
+        return self.line.fill(identifier)
+
+    def run(self, dev, identifier, log, stop_on_error=False):
+        log(f" -> {self.line.fill(identifier)}")
+        log(self.message)
+        return self.message
+
+
+class _RegisterLine:
+    """
+    A read/user-ram-read/ef-read line lowered to register frames, plus
+    how to print its results the way the shell command does.
+    """
+
+    def __init__(self, step, frames, show):
+        self.step = step        # the equivalent CommandStep (fallback)
+        self.frames = frames    # [(name, None | value), ...]
+        self.show = show        # fn(values read, in frame order) -> None
+
+
+class RegisterStep:
+    """
+    Consecutive register reads run as one multi-frame transaction
+    (ModbusInterface.transact) instead of one round trip per line.
+
+    Only reads are merged: if the transaction fails, the group is rerun line
+    by line, and a write could have been applied before the failure (a group
+    can span several packets), so replaying it would repeat its effect.
+
+    group is the step's index in the plan; result records of its lines carry
+    it (see step_records).
+    """
+
+    fails_device = True
+    command = "registers"
+
+    def __init__(self, lines, group=None):
+        self.lines = lines
+        self.group = group
+        self.frames = [f for line in lines for f in line.frames]
+
+    def text(self, identifier):
+        return " ; ".join(line.step.text(identifier) for line in self.lines)
+
+    def run(self, dev, identifier, log, stop_on_error=False, line_errors=None):
+        """
+        If line_errors is a list and the group had to be rerun line by line,
+        each line that ran appends its own result (None or the error).
+        """
+        try:
+            dev.modbus.resolve(name for name, _ in self.frames)
+            results = dev.modbus.transact(self.frames)
+        except Exception:
+            # Unknown name or a frame the device rejected: rerun line by line
+            # so only the bad line fails and the others print their values
+            return self._run_lines(dev, identifier, log, stop_on_error, line_errors)
+
+        pos = 0
+        for line in self.lines:
+            log(f" -> {line.step.line.fill(identifier)}")
+            values = results[pos:pos + len(line.frames)]
+            pos += len(line.frames)
+            line.show([v for v, (_, w) in zip(values, line.frames) if w is None])
+        return None
+
+    def _run_lines(self, dev, identifier, log, stop_on_error, line_errors):
+        first_error = None
+        for line in self.lines:
+            error = line.step.run(dev, identifier, log)
+            if line_errors is not None:
+                line_errors.append(error)
+            if error is not None and stop_on_error:
+                return error
+            if first_error is None:
+                first_error = error
+        return first_error
+
+
+# -------------------------------------------------------
+# Lowering of the register read commands (merged when consecutive)
+# -------------------------------------------------------
+def _show_single_or_named(names):
+    if len(names) == 1:
+        return lambda values: print(values[0])
+
+    def show(values):
+        for name, value in dict(zip(names, values)).items():
+            print(f"{name} = {value}")
+    return show
+
+
+def _lower_read(args):
+    if not args:
+        return None
+    return [(name, None) for name in args], _show_single_or_named(args)
+
+
+def _lower_user_ram_read(args):
+    if len(args) < 2 or args[0] not in USER_RAM_LAYOUT:
+        return None
+    typ, idx = args[0], int(args[1])
+    convert = float if typ == "F32" else int
+    return [(f"USER_RAM{idx}_{typ}", None)], lambda values: print(convert(values[0]))
+
+
+def _lower_ef_read(args):
+    if not args:
+        return None
+    return [(f"{ain}_EF_READ_A", None) for ain in args], _show_single_or_named(args)
+
+
+# Writes are deliberately absent: see RegisterStep.
+_LOWERINGS = {
+    "read": _lower_read,
+    "user-ram-read": _lower_user_ram_read,
+    "ef-read": _lower_ef_read,
+}
+
+
+def _lower(cmd, args):
+    """
+    (frames, show) for a coalescible register line, else None.
+    """
+    lower = _LOWERINGS.get(cmd)
+    if lower is None or any(DEVICE_VAR in a for a in args):
+        return None
+    try:
+        return lower(args)
+    except ValueError:
+        # Malformed value: leave it to the command to report
+        return None
+
+
+# -------------------------------------------------------
+# Compilation
+# -------------------------------------------------------
+class BatchPlan:
+    """
+    A command script parsed once and shared by every device: lines are split
+    and looked up in the registry at compile time, $DEVICE is filled in per
+    device by joining pre-split parts, and runs of register commands become
+    single multi-frame transactions.
+    """
+
+    def __init__(self, steps, line_count, coalesce=True):
+        self.steps = steps
+        self.line_count = line_count
+        self.coalesce = coalesce
+
+    def __len__(self):
+        return self.line_count
+
+    def transactions(self):
+        """
+        Steps per device, i.e. register transactions plus other commands.
+        """
+        return len(self.steps)
+
+    def run(self, dev, identifier, log, stop_on_error=False, on_step=None):
+        """
+        Execute the plan on dev. Returns True if every step succeeded.
+        on_step(record) is called after each step with its timing, LJM
+        round trips/bytes and error, once per line of a merged group (see
+        step_records).
+        """
+        success = True
+        for step in self.steps:
+            if on_step is None:
+                error = step.run(dev, identifier, log, stop_on_error)
+            else:
+                before, start, error, end, line_errors = _timed_run(
+                    step, dev, identifier, log, stop_on_error
+                )
+                for record in step_records(dev, identifier, step, start, before, error,
+                                           end, line_errors):
+                    on_step(record)
+            if error is None:
+                continue
+            if stop_on_error:
+                return False
+            if step.fails_device:
+                success = False
+        return success
+
+    async def run_async(self, dev, identifier, log, call, stop_on_error=False, on_step=None):
+        """
+        Like run(), as a coroutine: each step is awaited through
+        call(fn, *args), e.g. a coroutine that runs fn on an executor.
+        """
+        success = True
+        for step in self.steps:
+            if on_step is None:
+                error = await call(step.run, dev, identifier, log, stop_on_error)
+            else:
+                # Timed on the executor thread, so queueing isn't counted
+                before, start, error, end, line_errors = await call(
+                    _timed_run, step, dev, identifier, log, stop_on_error
+                )
+                for record in step_records(dev, identifier, step, start, before, error,
+                                           end, line_errors):
+                    on_step(record)
+            if error is None:
+                continue
+            if stop_on_error:
+                return False
+            if step.fails_device:
+                success = False
+        return success
+
+
+# -------------------------------------------------------
+# Per-step result records
+# -------------------------------------------------------
+def _ljm_totals(dev):
+    stats = getattr(dev, "ljm_stats", None)
+    return stats.totals() if stats is not None else None
+
+
+def _timed_run(step, dev, identifier, log, stop_on_error):
+    before = _ljm_totals(dev)
+    start = time.time()
+    if isinstance(step, RegisterStep):
+        line_errors = []
+        error = step.run(dev, identifier, log, stop_on_error, line_errors)
+    else:
+        line_errors = None
+        error = step.run(dev, identifier, log, stop_on_error)
+    return before, start, error, time.time(), line_errors
+
+
+def error_code(error):
+    """
+    LJM error code if error is (or was raised from) an LJMError, else a
+    short label.
+    """
+    if error is None:
+        return None
+    cause = error
+    while cause is not None:
+        code = getattr(cause, "errorCode", None)
+        if code is not None:
+            return code
+        cause = cause.__cause__
+    if isinstance(error, BaseException):
+        return type(error).__name__
+    return "SCRIPT_ERROR"
+
+
+class _ConnectStep:
+    """
+    Stands in for connecting (or checking out) a device in result records.
+    """
+
+    command = "connect"
+
+    def text(self, identifier):
+        return f"connect {identifier}"
+
+
+CONNECT_STEP = _ConnectStep()
+
+
+def step_record(dev, identifier, step, start, before, error, end=None):
+    """
+    One result row: device, command, timing, LJM round trips/bytes (None
+    unless the device is instrumented) and error.
+    """
+    end = time.time() if end is None else end
+    after = _ljm_totals(dev) if before is not None else None
+    return {
+        "device": identifier,
+        "command": step.command,
+        "line": step.text(identifier),
+        "group": None,
+        "start": start,
+        "end": end,
+        "duration_ms": round((end - start) * 1000.0, 3),
+        "round_trips": after["round_trips"] - before["round_trips"] if after else None,
+        "bytes": after["bytes"] - before["bytes"] if after else None,
+        "ok": error is None,
+        "error_code": error_code(error),
+        "error": None if error is None else str(error),
+    }
+
+
+def step_records(dev, identifier, step, start, before, error, end=None, line_errors=None):
+    """
+    Result rows for one executed step: its step_record, or for a merged
+    RegisterStep one row per line that ran. Those rows share the
+    transaction's timing and round trips/bytes and carry its group; each has
+    its own command, line and, if the group was rerun line by line, error.
+    """
+    record = step_record(dev, identifier, step, start, before, error, end)
+    if not isinstance(step, RegisterStep):
+        return [record]
+
+    records = []
+    for i, line in enumerate(step.lines):
+        if line_errors:
+            if i >= len(line_errors):
+                break   # not reached under --stop-on-error
+            line_error = line_errors[i]
+        else:
+            line_error = error
+        records.append(dict(
+            record,
+            command=line.step.command,
+            line=line.step.text(identifier),
+            group=step.group,
+            ok=line_error is None,
+            error_code=error_code(line_error),
+            error=None if line_error is None else str(line_error),
+        ))
+    return records
+
+
+def compile_plan(lines, registry, coalesce=True):
+    """
+    Compile script lines (as load_lines yields them) into a BatchPlan.
+    coalesce=False keeps one step per line.
+    """
+    lines = list(lines)
+    steps = []
+    pending = []   # consecutive register lines
+
+    def flush():
+        if len(pending) == 1:
+            steps.append(pending[0].step)
+        elif pending:
+            steps.append(RegisterStep(list(pending), group=len(steps)))
+        pending.clear()
+
+    for line in lines:
+        try:
+            parts = shlex.split(line)
+        except Exception as e:
+            flush()
+            steps.append(ErrorStep(line, f"Parse error: {e}", "?"))
+            continue
+        if not parts:
+            continue
+
+        cmd, *args = parts
+        handler = registry.commands.get(cmd)
+        if handler is None:
+            flush()
+            steps.append(ErrorStep(line, f"Unknown command '{cmd}'", cmd))
+            continue
+
+        step = CommandStep(line, handler, args, cmd)
+        lowered = _lower(cmd, args) if coalesce else None
+        if lowered is None:
+            flush()
+            steps.append(step)
+            continue
+        pending.append(_RegisterLine(step, *lowered))
+
+    flush()
+    return BatchPlan(steps, len(lines), coalesce)
@@ -0,0 +1,202 @@
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import wait
+
+from t7sd_shell.batch_log import ThreadStdout
+
+# Seconds between deadline checks while waiting on worker output.
+POLL_INTERVAL = 0.25
+
+# Seconds a killed worker is given to exit before it is abandoned.
+KILL_GRACE = 5.0
+
+
+# -------------------------------------------------------
+# Worker side: one process per shard
+# -------------------------------------------------------
+def _worker_main(conn, devices, options):
+    """
+    Run the command script on a shard of devices with a thread pool,
+    reporting over conn:
+    ("start", id), ("out", id, line), ("step", record), ("done", id, ok, stats),
+    ("exit",).
+    """
+    # Imported here so the parent never builds a registry for workers
+    from t7sd_shell.batch import build_registry, run_commands_on_device
+    from t7sd_shell.batch_plan import compile_plan
+
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    # Everything printed is forwarded to the parent's BatchLog (as a note
+    # when no device is bound, e.g. connections closing)
+    stdout = ThreadStdout(lambda identifier, line: send(("out", identifier, line)))
+    sys.stdout = stdout
+
+    registry = build_registry()
+    # Each device runs once per worker, so connections are opened and closed
+    # per device rather than pooled
+    plan = compile_plan(options["commands"], registry, coalesce=options["coalesce"])
+
+    def run_one(identifier):
+        send(("start", identifier))
+        stats = {} if options["stats"] else None
+        stdout.bind(identifier)
+        try:
+            ok = run_commands_on_device(
+                identifier, plan, registry,
+                log_dir=None,
+                stop_on_error=options["stop_on_error"],
+                stats_out=stats,
+                backend=options["backend"],
+                index=options["index"],
+                index_max_age=options["index_max_age"],
+                on_step=(lambda record: send(("step", record))) if options["results"] else None,
+            )
+        except Exception as e:
+            print(f"❌ crashed: {e}")
+            ok = False
+        finally:
+            stdout.unbind()
+        send(("done", identifier, ok, stats.get(identifier) if stats else None))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, options["parallel"])) as executor:
+            list(executor.map(run_one, devices))
+    finally:
+        stdout.flush()
+        send(("exit",))
+        conn.close()
+
+
+# -------------------------------------------------------
+# Parent side: shard, stream, enforce deadlines
+# -------------------------------------------------------
+class _Worker:
+    def __init__(self, ctx, shard, options):
+        self.pending = list(shard)     # not yet started
+        self.running = {}              # identifier -> start time
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, self.pending, options), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(KILL_GRACE)
+        self.conn.close()
+
+
+def run_sharded(devices, commands, args, stats, batch_log, results=None):
+    """
+    Run the script on every device across args.processes worker processes,
+    each with args.parallel threads. A device running longer than
+    args.device_timeout seconds gets its worker killed and is reported as
+    failed (along with anything else in flight on that worker); a new worker
+    takes over the rest of the shard. Worker output is written by the
+    parent's batch_log, and step records go to results (a ResultsWriter).
+    Returns {identifier: ok}.
+    """
+    processes = max(1, min(args.processes, len(devices)))
+    options = {
+        "commands": list(commands),
+        "coalesce": not args.no_coalesce,
+        "parallel": args.parallel,
+        "stop_on_error": args.stop_on_error,
+        "stats": stats is not None,
+        "results": results is not None,
+        "backend": args.backend,
+        "index": args.index,
+        "index_max_age": args.index_max_age,
+    }
+    timeout = args.device_timeout
+
+    print(f"🌐 Running {len(commands)} commands for {len(devices)} devices "
+          f"on {processes} processes x {max(1, args.parallel)} threads\n")
+
+    # Spawned, not forked: every worker gets a fresh LJM context
+    ctx = multiprocessing.get_context("spawn")
+    workers = [
+        _Worker(ctx, devices[i::processes], options) for i in range(processes)
+    ]
+    outcomes = {}
+
+    def finish(identifier, ok, message):
+        outcomes[identifier] = ok
+        batch_log.result(identifier, ok, message)
+
+    def retire(worker, reason, respawn):
+        workers.remove(worker)
+        for identifier in worker.running:
+            finish(identifier, False, f"❌ {identifier} {reason}")
+        if respawn and worker.pending:
+            # Only unstarted devices are handed to a fresh worker
+            workers.append(_Worker(ctx, worker.pending, options))
+        else:
+            for identifier in worker.pending:
+                finish(identifier, False, f"❌ {identifier} skipped ({reason})")
+
+    while workers:
+        by_conn = {w.conn: w for w in workers}
+        for conn in wait(list(by_conn), timeout=POLL_INTERVAL):
+            worker = by_conn[conn]
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                worker.process.join(KILL_GRACE)
+                # A crash with a device in flight is blamed on that device; one
+                # before any device started would just happen again
+                retire(worker, f"lost its worker (exit code {worker.process.exitcode})",
+                       respawn=bool(worker.running))
+                continue
+
+            kind, *rest = message
+            if kind == "start":
+                identifier, = rest
+                worker.pending.remove(identifier)
+                worker.running[identifier] = time.monotonic()
+                batch_log.start(identifier)
+            elif kind == "out":
+                identifier, line = rest
+                batch_log.write(identifier, line)
+            elif kind == "step":
+                record, = rest
+                if results is not None:
+                    results.record(record)
+            elif kind == "done":
+                identifier, ok, device_stats = rest
+                worker.running.pop(identifier, None)
+                if stats is not None and device_stats is not None:
+                    stats[identifier] = device_stats
+                batch_log.end(identifier, device_stats)
+                if ok:
+                    finish(identifier, True, f"✔  {identifier} completed successfully")
+                else:
+                    finish(identifier, False, f"❌ {identifier} had errors")
+            elif kind == "exit":
+                worker.process.join(KILL_GRACE)
+                worker.conn.close()
+                workers.remove(worker)
+
+        if timeout is None:
+            continue
+        now = time.monotonic()
+        for worker in list(workers):
+            expired = [i for i, t in worker.running.items() if now - t > timeout]
+            if expired:
+                worker.kill()
+                for identifier in expired:
+                    worker.running.pop(identifier)
+                    finish(identifier, False,
+                           f"❌ {identifier} timed out after {timeout:g}s (worker killed)")
+                retire(worker, "aborted: its worker was killed", respawn=True)
+
+    return outcomes
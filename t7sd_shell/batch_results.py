@@ -0,0 +1,111 @@
+import csv
+import json
+import threading
+from datetime import datetime
+
+from t7sd_api.instrument import CallStats
+
+RESULT_FIELDS = [
+    "device", "command", "line", "group", "start", "end", "duration_ms",
+    "round_trips", "bytes", "ok", "error_code", "error",
+]
+
+RESULT_FORMATS = ("csv", "jsonl")
+
+# Rows in the "slowest devices" table of the summary.
+SLOWEST_DEVICES = 10
+
+# Most recent durations kept per command and per device for the percentiles
+# (counts and totals still cover every row), so --repeat runs stay bounded.
+RESULT_SAMPLES = 4096
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat(timespec="milliseconds")
+
+
+class ResultsWriter:
+    """
+    Machine-readable record of every executed batch step (one row per
+    command; lines of a merged register group share its timing and group),
+    written as CSV or JSONL as the run goes, plus per-command and per-device
+    timing for the summary. Safe to call from any thread.
+    """
+
+    def __init__(self, path, fmt=None):
+        fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+        if fmt not in RESULT_FORMATS:
+            raise ValueError(f"results format must be one of {', '.join(RESULT_FORMATS)}")
+        self.path = path
+        self.fmt = fmt
+        self.commands = {}   # command -> CallStats of durations
+        self.devices = {}    # device -> CallStats of durations
+        self.errors = {}     # device -> failed steps
+        self._groups = {}    # device -> (group, start) of its last merged row
+        self._lock = threading.Lock()
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        if fmt == "csv":
+            self._writer = csv.DictWriter(self._file, fieldnames=RESULT_FIELDS)
+            self._writer.writeheader()
+
+    def record(self, row):
+        """
+        Add one step record (see batch_plan.step_record).
+        """
+        out = dict(row, start=_iso(row["start"]), end=_iso(row["end"]))
+        seconds = row["duration_ms"] / 1000.0
+        with self._lock:
+            if self.fmt == "csv":
+                self._writer.writerow(out)
+            else:
+                self._file.write(json.dumps(out) + "\n")
+            # Later lines of a merged group repeat its cost: count it once
+            shared = False
+            if row.get("group") is not None:
+                group = (row["group"], row["start"])
+                shared = self._groups.get(row["device"]) == group
+                self._groups[row["device"]] = group
+            nbytes = 0 if shared else row["bytes"] or 0
+            round_trips = 0 if shared else row["round_trips"] or 0
+            self._stats(self.commands, row["command"]).record(seconds, nbytes, round_trips)
+            if not shared:
+                self._stats(self.devices, row["device"]).record(seconds, nbytes, round_trips)
+            if not row["ok"]:
+                self.errors[row["device"]] = self.errors.get(row["device"], 0) + 1
+
+    def _stats(self, table, key):
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = CallStats(max_samples=RESULT_SAMPLES)
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def summary(self, slowest=SLOWEST_DEVICES):
+        """
+        Text tables: latency percentiles per command, then the slowest devices.
+        """
+        header = (f"{'calls':>7} {'rtt':>7} {'bytes':>10} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+
+        def row(name, s, extra=""):
+            summary = s.summary()
+            return (f"{name[:28]:<28} {summary['calls']:>7} {summary['round_trips']:>7} "
+                    f"{summary['bytes']:>10} {summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} "
+                    f"{summary['p99_ms']:>8.1f} {summary['max_ms']:>8.1f}{extra}")
+
+        with self._lock:
+            commands = sorted(self.commands.items(), key=lambda kv: kv[1].percentile(95), reverse=True)
+            devices = sorted(self.devices.items(), key=lambda kv: kv[1].total_s, reverse=True)
+            errors = dict(self.errors)
+
+        lines = [f"{'COMMAND':<28} {header}"]
+        lines += [row(name, s) for name, s in commands]
+        lines += ["", f"{'SLOWEST DEVICES':<28} {header} {'total s':>8} {'errors':>7}"]
+        lines += [
+            row(name, s, f" {s.total_s:>8.2f} {errors.get(name, 0):>7}")
+            for name, s in devices[:slowest]
+        ]
+        return "\n".join(lines)
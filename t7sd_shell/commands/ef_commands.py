@@ -1,7 +1,12 @@
 def register_ef_commands(registry):
     @registry.command("ef-read")
     def cmd_ef_read(dev, args):
-        print(dev.ef.read_ef_value(args[0]))
+        if len(args) == 1:
+            print(dev.ef.read_ef_value(args[0]))
+            return
+
+        for ain, value in dev.ef.read_ef_values(args).items():
+            print(f"{ain} = {value}")
 
     @registry.command("ef-set")
     def cmd_ef_set(dev, args):
@@ -12,3 +17,28 @@ def register_ef_commands(registry):
         C = float(kv["C"])
         D = float(kv["D"])
         dev.ef.configure_thermistor_SH(ain, A, B, C, D)
+
+    @registry.command("ef-set-many")
+    def cmd_ef_set_many(dev, args):
+        # AIN names followed by A= B= C= D=; consecutive AINs share coefficients
+        coefficients = {}
+        pending, kv = [], {}
+        for a in args + [None]:
+            if a is not None and "=" in a:
+                key, value = a.split("=", 1)
+                kv[key] = float(value)
+                continue
+            if kv:
+                if not pending:
+                    print("Usage: ef-set-many <AINx> [<AINy> ...] A=<a> B=<b> C=<c> D=<d> ...")
+                    return
+                for ain in pending:
+                    coefficients[ain] = (kv["A"], kv["B"], kv["C"], kv["D"])
+                pending, kv = [], {}
+            if a is not None:
+                pending.append(a)
+
+        if pending or not coefficients:
+            print("Usage: ef-set-many <AINx> [<AINy> ...] A=<a> B=<b> C=<c> D=<d> ...")
+            return
+        dev.ef.configure_thermistors_SH(coefficients)
@@ -1,9 +1,30 @@
 def register_modbus_commands(registry):
     @registry.command("read")
     def cmd_read(dev, args):
-        print(dev.modbus.read(args[0]))
+        if not args:
+            print("Usage: read <register> [<register> ...]")
+            return
+        if len(args) == 1:
+            print(dev.modbus.read(args[0]))
+            return
+
+        # several registers -> one multi-frame transaction
+        for name, value in dev.modbus.read_many(args).items():
+            print(f"{name} = {value}")
 
     @registry.command("write")
     def cmd_write(dev, args):
+        if args and all("=" in a for a in args):
+            # write A=1 B=2 ... -> one multi-frame transaction
+            mapping = {}
+            for a in args:
+                name, value = a.split("=", 1)
+                mapping[name] = float(value)
+            dev.modbus.write_many(mapping)
+            return
+
+        if len(args) != 2:
+            print("Usage: write <register> <value> | write <register>=<value> [...]")
+            return
         name, value = args
         dev.modbus.write(name, float(value))
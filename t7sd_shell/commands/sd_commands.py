@@ -1,12 +1,14 @@
 import os
 import datetime
+import fnmatch
+import posixpath
 
 def register_sd_commands(registry):
     @registry.command("ls")
     def cmd_ls(dev, args):
         path = args[0] if args else None
-        entries = dev.sd.list_dir(path)
-        for e in entries:
+        # Print each entry as soon as the device returns it
+        for e in dev.sd.iter_dir(path):
             if e.is_file:
                 print(f"{e.name:<32}  FILE   {e.size} bytes")
             elif e.is_dir:
@@ -22,29 +24,31 @@ def register_sd_commands(registry):
     def cmd_pwd(dev, args):
         print(dev.sd.get_cwd())
 
+    @registry.command("stat")
+    def cmd_stat(dev, args):
+        if len(args) != 1:
+            print("Usage: stat <path>")
+            return
+        e = dev.sd.stat(args[0])
+        kind = "FILE" if e.is_file else "DIR" if e.is_dir else "OTHER"
+        print(f"{e.name}  {kind}  {e.size} bytes  attr=0x{e.raw_attr:02X}")
+
     @registry.command("cat")
     def cmd_cat(dev, args):
         print(dev.sd.read_file_text(args[0]))
 
     @registry.command("get")
     def cmd_get(dev, args):
+        resume = "--resume" in args
+        args = [a for a in args if a != "--resume"]
         if len(args) != 2:
-            print("Usage: get <remote_path> <local_path>")
+            print("Usage: get [--resume] <remote_path> <local_path>")
             return
 
         remote_path, local_path = args
 
         # -------------------------------------------------------
-        # 1. Read file bytes from the device SD card
-        # -------------------------------------------------------
-        try:
-            data = dev.sd.read_file_bytes(remote_path)
-        except Exception as e:
-            print(f"Error reading remote file '{remote_path}': {e}")
-            return
-
-        # -------------------------------------------------------
-        # 2. Build timestamped directory structure
+        # 1. Build timestamped directory structure
         # -------------------------------------------------------
         now = datetime.datetime.now()
         date_str = now.strftime("%Y-%m-%d")
@@ -68,8 +72,11 @@ def register_sd_commands(registry):
         # final filename has timestamp prefix
         final_path = os.path.join(full_dir, f"{time_str}_{base_name}")
 
+        # partial downloads live at a fixed path so a later --resume finds them
+        part_path = os.path.join(base_dir, identifier, f"{base_name}.part")
+
         # -------------------------------------------------------
-        # 3. Ensure directories exist
+        # 2. Ensure directories exist
         # -------------------------------------------------------
         try:
             os.makedirs(full_dir, exist_ok=True)
@@ -78,7 +85,7 @@ def register_sd_commands(registry):
             return
 
         # -------------------------------------------------------
-        # 4. Auto-rename duplicates
+        # 3. Auto-rename duplicates
         # -------------------------------------------------------
         path_no_ext, ext = os.path.splitext(final_path)
         counter = 1
@@ -91,19 +98,99 @@ def register_sd_commands(registry):
         final_path = candidate_path
 
         # -------------------------------------------------------
-        # 5. Write file
+        # 4. Stream file from the device to the .part file, then rename
         # -------------------------------------------------------
         try:
-            with open(final_path, "wb") as f:
-                f.write(data)
-            print(f"Downloaded '{remote_path}' → '{final_path}'")
+            dev.sd.download_file(
+                remote_path, final_path, resume=resume, part_path=part_path
+            )
         except Exception as e:
-            print(f"Error writing to '{final_path}': {e}")
+            print(f"Error downloading '{remote_path}': {e}")
+            if os.path.exists(part_path):
+                print(f"Partial data kept in '{part_path}'; retry with 'get --resume'.")
+            return
+
+        print(f"Downloaded '{remote_path}' → '{final_path}'")
+
+    @registry.command("sync")
+    def cmd_sync(dev, args):
+        if len(args) != 2:
+            print("Usage: sync <remote_dir> <local_dir>")
+            return
+
+        remote_dir, local_dir = args
+
+        # one mirror (and manifest) per device
+        identifier = dev.identifier.replace("/", "_").replace("\\", "_")
+        device_dir = os.path.join(local_dir, identifier)
+
+        results = dev.sd.sync(remote_dir, device_dir)
+        total = 0
+        for r in results:
+            if r.action != "skipped":
+                print(f"{r.name:<32}  {r.action:<10}  {r.bytes_written} bytes")
+            total += r.bytes_written
+
+        skipped = sum(1 for r in results if r.action == "skipped")
+        print(
+            f"Synced {len(results)} files into '{device_dir}' "
+            f"({skipped} unchanged, {total} bytes transferred)"
+        )
 
     @registry.command("rm")
     def cmd_rm(dev, args):
         dev.sd.delete_file(args[0])
 
+    @registry.command("find")
+    def cmd_find(dev, args):
+        if not args or len(args) > 2:
+            print("Usage: find <pattern> [path]")
+            return
+
+        # FAT names are case-insensitive
+        pattern = args[0].lower()
+        top = args[1] if len(args) > 1 else None
+        matches = 0
+        for dir_path, listing in dev.sd.walk(top, onerror=_report_walk_error, compact=True):
+            for i, name in enumerate(listing.names()):
+                if fnmatch.fnmatchcase(name.lower(), pattern):
+                    suffix = "/" if listing.is_dir(i) else ""
+                    print(posixpath.join(dir_path, name) + suffix)
+                    matches += 1
+        print(f"{matches} match(es)")
+
+    @registry.command("du")
+    def cmd_du(dev, args):
+        top = args[0] if args else None
+
+        # Directories still open in the walk, as [path, bytes so far]; a
+        # directory's total is printed once the walk leaves its subtree.
+        open_dirs = []
+
+        def close_until(path):
+            while open_dirs and not _is_within(path, open_dirs[-1][0]):
+                dir_path, total = open_dirs.pop()
+                print(f"{total:>14}  {dir_path}")
+                if open_dirs:
+                    open_dirs[-1][1] += total
+
+        for dir_path, listing in dev.sd.walk(top, onerror=_report_walk_error, compact=True):
+            close_until(dir_path)
+            open_dirs.append([dir_path, listing.total_file_bytes()])
+        close_until(None)
+
+    @registry.command("tree")
+    def cmd_tree(dev, args):
+        top = dev.sd.abspath(args[0] if args else None)
+        base_depth = 0 if top == "/" else top.count("/")
+        for dir_path, entries in dev.sd.walk(top, onerror=_report_walk_error):
+            depth = (0 if dir_path == "/" else dir_path.count("/")) - base_depth
+            name = dir_path if depth == 0 else posixpath.basename(dir_path)
+            print("    " * depth + name.rstrip("/") + "/")
+            for e in entries:
+                if e.is_file:
+                    print("    " * (depth + 1) + f"{e.name}  ({e.size} bytes)")
+
     @registry.command("info")
     def cmd_info(dev, args):
         info = dev.sd.get_disk_info()
@@ -112,3 +199,13 @@ def register_sd_commands(registry):
             f"Free:  {info.free_mb:.2f} MB\n"
             f"Sector: {info.sector_size_bytes} bytes\n"
         )
+
+
+def _is_within(path, ancestor):
+    if path is None:
+        return False
+    return path == ancestor or path.startswith(ancestor.rstrip("/") + "/")
+
+
+def _report_walk_error(path, exc):
+    print(f"Skipping '{path}': {exc}")
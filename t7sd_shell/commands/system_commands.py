@@ -1,4 +1,5 @@
 from t7sd_shell.help_pages import print_help
+from t7sd_api import format_stats
 import os
 def register_system_commands(registry):
     @registry.command("help")
@@ -22,3 +23,13 @@ def register_system_commands(registry):
             os.system('cls')
         else:
             os.system('clear')
+
+    @registry.command("stats")
+    def cmd_stats(dev, args):
+        if dev.ljm_stats is None:
+            print("Instrumentation is not enabled; start the shell with --stats.")
+            return
+        if args and args[0] == "reset":
+            dev.reset_stats()
+            return
+        print(format_stats(dev.stats()))
@@ -22,3 +22,10 @@ def register_user_ram_commands(registry):
             dev.user_ram.write_u32(idx, int(val))
         elif typ == "U16":
             dev.user_ram.write_u16(idx, int(val))
+
+    @registry.command("user-ram-dump")
+    def cmd_ram_dump(dev, args):
+        typ = args[0]
+        values = dev.user_ram.read_block(typ)
+        for idx, value in enumerate(values):
+            print(f"USER_RAM{idx}_{typ} = {value}")
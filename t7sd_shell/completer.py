@@ -30,7 +30,7 @@ class ShellCompleter:
         cmd = tokens[0]
 
         # SD PATH COMPLETION
-        if cmd in ("ls", "cd", "cat", "get", "rm"):
+        if cmd in ("ls", "cd", "cat", "get", "rm", "stat", "find", "du", "tree", "sync"):
             paths = self.sd_cache.complete_path(text)
             try:
                 return paths[state]
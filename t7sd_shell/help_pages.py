@@ -5,9 +5,18 @@ SD CARD COMMANDS
 ls [path]            List directory contents
 cd <path>            Change working directory
 pwd                  Print working directory
+stat <path>          Show one entry's type, size and attributes
 cat <file>           View file contents
 get <remote> <local> Download file to PC
+get --resume <remote> <local>
+                     Continue an interrupted download
+sync <remote_dir> <local_dir>
+                     Mirror a directory, fetching only new/grown files
 rm <remote>          Delete a file
+find <pattern> [path]
+                     Recursively list names matching a glob (e.g. *.csv)
+du [path]            Bytes used per directory, recursively
+tree [path]          Recursive directory tree with file sizes
 info                 Show disk info
 """,
 
@@ -15,14 +24,19 @@ info                 Show disk info
 MODBUS COMMANDS
 ---------------
 read <register>             Read a register value
+read <reg> <reg> ...        Read several registers in one transaction
 write <register> <value>    Write a register
+write <reg>=<v> <reg>=<v>   Write several registers in one transaction
 """,
 
     "ef": """
 EF / THERMISTOR COMMANDS
 ------------------------
-ef-read <AINx>          
+ef-read <AINx> [<AINy> ...]
 ef-set <AINx> A=<a> B=<b> C=<c> D=<d>
+ef-set-many <AINx> [<AINy> ...] A=<a> B=<b> C=<c> D=<d> [<AINz> A=...]
+                        Configure many thermistors in one transaction;
+                        consecutive AINs share the coefficients after them
 """,
 
     "user_ram": """
@@ -30,6 +44,7 @@ USER RAM COMMANDS
 -----------------
 user-ram-read <type> <index>
 user-ram-write <type> <index> <value>
+user-ram-dump <type>        Read every slot of a type in one transaction
 
 types: F32 [0..39], I32 [0..9], U32 [0..39], U16 [0..19]
 """,
@@ -40,6 +55,8 @@ SYSTEM COMMANDS
 help                Show this help
 help <section>      Show help for SD, EF, RAM, SYSTEM, etc.
 clear               Clears all text from the screen
+stats               Show LJM round trips, bytes and latency per operation/register
+stats reset         Clear the collected statistics
 quit / exit         Exit the shell
 """
 }
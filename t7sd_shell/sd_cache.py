@@ -1,41 +1,101 @@
+import posixpath
 import threading
+import time
+from collections import OrderedDict
+
+from t7sd_api.scheduler import priority
+from t7sd_api.sd import SDPreempted
+
+# Directories kept before the least recently used listing is evicted.
+DEFAULT_MAX_DIRS = 128
+
+# Seconds a listing is trusted before it is fetched again (files keep being
+# logged to the card, so sizes and names drift).
+DEFAULT_TTL = 30.0
+
+# Seconds without shell activity before the prefetcher touches the device.
+DEFAULT_IDLE_DELAY = 1.0
+
+# Most child directories of the cwd prefetched per idle period.
+DEFAULT_PREFETCH_CHILDREN = 16
+
 
 class SDCache:
     """
     A safe-on-T7 SD directory cache.
     Does NOT recursively walk the filesystem.
-    Caches only the directories that the user actually visits or requests.
+    Caches the directories that the user visits or requests, plus (while the
+    shell is idle) the current directory and its immediate children.
+
+    Listings are kept in a bounded LRU with a per-entry TTL, and are dropped
+    automatically when the SD interface reports an rm or get. A cd only marks
+    the new directory's listing stale: completion keeps serving it while it
+    is refreshed in the background. Completion
+    misses are filled from the device's persistent SD index when one is
+    attached, so a new session can complete paths before touching the device.
     """
 
-    def __init__(self, dev):
+    def __init__(
+        self,
+        dev,
+        max_dirs=DEFAULT_MAX_DIRS,
+        ttl=DEFAULT_TTL,
+        prefetch=True,
+        idle_delay=DEFAULT_IDLE_DELAY,
+        prefetch_children=DEFAULT_PREFETCH_CHILDREN,
+    ):
         self.dev = dev
-        self.cache = {}      # path -> [entries]
+        self.max_dirs = max_dirs
+        self.ttl = ttl
+        self.idle_delay = idle_delay
+        self.prefetch_children = prefetch_children
+
+        self.cache = OrderedDict()  # abs path -> (fetched_at, [entries])
         self.lock = threading.Lock()
 
-    def get(self, path):
+        self._last_activity = time.monotonic()
+        self._stale = set()         # paths served stale; refresh when idle
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+        dev.sd.add_listener(self._on_sd_event)
+        if prefetch:
+            self.start()
+
+    # ------------------ lookups ------------------ #
+
+    def get(self, path, allow_stale=False):
         """
-        Return cached list for `path`, or fetch and store it safely.
+        Return cached names for `path`, or fetch and store them safely.
+        With allow_stale=True nothing blocks on the device: an expired listing
+        is returned as-is and a missing one as [], and either is fetched in
+        the background (when the prefetcher is running).
         """
-        # Normalize path
-        if not path or path == "":
-            path = "/"
-
-        with self.lock:
-            if path in self.cache:
-                return self.cache[path]
+        return [e.name for e in self.get_entries(path, allow_stale)]
 
-        # Fetch from device, safely (no recursion)
+    def get_entries(self, path, allow_stale=False):
         try:
-            entries = self.dev.sd.list_dir(path)
-            names = [e.name for e in entries]
-        except Exception as e:
-            # Avoid spamming output
+            path = self.dev.sd.abspath(path or "/")
+        except Exception:
             return []
 
-        with self.lock:
-            self.cache[path] = names
+        cached = self._lookup(path, use_index=allow_stale)
+        if cached is not None:
+            fetched_at, entries = cached
+            if time.monotonic() - fetched_at < self.ttl:
+                return entries
+            if allow_stale:
+                self._queue_refresh(path)
+                return entries
+        elif allow_stale and self._prefetching():
+            # Don't hold up readline on the device; the next TAB will have it
+            self._queue_refresh(path)
+            return []
 
-        return names
+        # Fetch from device, safely (no recursion)
+        entries = self._fetch(path)
+        return entries if entries is not None else []
 
     def complete_path(self, prefix):
         """
@@ -51,9 +111,211 @@ class SDCache:
             dir_part = cwd
             partial = prefix
 
-        names = self.get(dir_part)
+        names = self.get(dir_part, allow_stale=True)
         return [
             (dir_part.rstrip("/") + "/" + name)
             for name in names
             if name.startswith(partial)
         ]
+
+    # ------------------ invalidation ------------------ #
+
+    def invalidate(self, path=None, recursive=False):
+        """
+        Drop the listing for `path` (and everything below it if recursive),
+        or the whole cache when path is None.
+        """
+        with self.lock:
+            if path is None:
+                self.cache.clear()
+                self._stale.clear()
+                return
+            self.cache.pop(path, None)
+            if recursive:
+                prefix = path.rstrip("/") + "/"
+                for key in [k for k in self.cache if k.startswith(prefix)]:
+                    del self.cache[key]
+
+    def mark_stale(self, path):
+        """
+        Expire the listing for `path` without dropping it: lookups that allow
+        stale data still get it, others fetch again, and the prefetcher
+        refreshes it when the shell is idle.
+        """
+        with self.lock:
+            cached = self.cache.get(path)
+            if cached is None:
+                return
+            self.cache[path] = (float("-inf"), cached[1])
+            self._stale.add(path)
+
+    def _on_sd_event(self, event, path):
+        if event == "chdir":
+            # Refresh the directory the user just entered, but keep the old
+            # listing for completion until the new one arrives
+            self.mark_stale(path)
+        elif event == "delete":
+            self.invalidate(posixpath.dirname(path))
+            self.invalidate(path, recursive=True)
+        elif event == "download":
+            # Size may have changed since the parent was listed
+            self.invalidate(posixpath.dirname(path))
+        self._wake.set()
+
+    # ------------------ background prefetch ------------------ #
+
+    def touch(self):
+        """
+        Record shell activity; the prefetcher stays off the device until
+        idle_delay seconds have passed without another touch().
+        """
+        self._last_activity = time.monotonic()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._prefetch_loop, name="sd-cache-prefetch", daemon=True
+        )
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop the prefetch thread and detach from the SD interface.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.dev.sd.remove_listener(self._on_sd_event)
+
+    def _prefetching(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _queue_refresh(self, path):
+        with self.lock:
+            self._stale.add(path)
+        self._wake.set()
+
+    def _idle(self):
+        return time.monotonic() - self._last_activity >= self.idle_delay
+
+    def _prefetch_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=max(self.idle_delay, 0.05))
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if not self._idle():
+                continue
+            for path in self._prefetch_targets():
+                if self._stop.is_set() or not self._idle():
+                    break
+                # Never queue behind a foreground command: skip this round if
+                # the device is busy and try again on the next wake-up. A
+                # foreground SD command arriving mid-listing takes over the
+                # interface (the listing is dropped and retried later), and
+                # on a scheduled device the listing's calls also yield to any
+                # foreground register reads.
+                with priority(self.dev.ljm, "background"):
+                    fetched = self._fetch(path, blocking=False)
+                if fetched is None:
+                    break
+
+    def _prefetch_targets(self):
+        try:
+            cwd = self.dev.sd.get_cwd()
+        except Exception:
+            return
+
+        with self.lock:
+            stale = list(self._stale)
+            self._stale.clear()
+        for path in stale:
+            if not self._is_fresh(path):
+                yield path
+
+        if not self._is_fresh(cwd):
+            yield cwd
+        with self.lock:
+            cached = self.cache.get(cwd)
+        if cached is None:
+            return
+        children = [e for e in cached[1] if e.is_dir][: self.prefetch_children]
+        for entry in children:
+            child = posixpath.join(cwd, entry.name)
+            if not self._is_fresh(child):
+                yield child
+
+    # ------------------ internal helpers ------------------ #
+
+    def _lookup(self, path, use_index=False):
+        """
+        (fetched_at, entries) from memory, falling back (if use_index) to the
+        device's persistent index, i.e. listings saved by earlier sessions.
+        """
+        with self.lock:
+            cached = self.cache.get(path)
+            if cached is not None:
+                self.cache.move_to_end(path)
+                return cached
+
+        try:
+            indexed = self.dev.sd.indexed_listing(path)
+        except Exception:
+            indexed = None
+        if indexed is None:
+            return None
+
+        # Indexed listings may predate a cd/rm or new log files, so they are
+        # only ever served stale and refreshed from the device when idle.
+        cached = (float("-inf"), indexed[1])
+        self._store(path, cached)
+        return cached
+
+    def _store(self, path, cached):
+        with self.lock:
+            self.cache[path] = cached
+            self.cache.move_to_end(path)
+            while len(self.cache) > self.max_dirs:
+                self.cache.popitem(last=False)
+
+    def _is_fresh(self, path):
+        with self.lock:
+            cached = self.cache.get(path)
+        return cached is not None and time.monotonic() - cached[0] < self.ttl
+
+    def _fetch(self, path, blocking=True):
+        """
+        List `path` on the device and store it. Returns the entries, or None
+        if the listing failed or (blocking=False) the device was busy.
+
+        blocking=False is the prefetcher's background mode: the listing also
+        gives way to any foreground SD operation that starts waiting for it.
+        """
+        sd = self.dev.sd
+        if blocking:
+            try:
+                entries = sd.list_dir(path)
+            except Exception:
+                # Avoid spamming output
+                return None
+        else:
+            if not sd.lock.acquire(blocking=False):
+                return None
+            try:
+                with sd.preemptible():
+                    entries = sd.list_dir(path)
+            except SDPreempted:
+                with self.lock:
+                    self._stale.add(path)
+                return None
+            except Exception:
+                return None
+            finally:
+                sd.lock.release()
+
+        self._store(path, (time.monotonic(), entries))
+        return entries
@@ -3,7 +3,7 @@ Modular refactored shell using new t7sd_api package.
 """
 
 import argparse
-from t7sd_api import LabJackSD
+from t7sd_api import DevicePool
 from t7sd_shell.command_registry import CommandRegistry
 from t7sd_shell.completer import ShellCompleter
 from t7sd_shell.sd_cache import SDCache   
@@ -31,6 +31,12 @@ except ImportError:
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--identifier", default="ANY")
+    parser.add_argument("--backend", default="ljm", choices=["ljm", "sim"],
+                        help="'sim' runs against the in-process T7 simulator")
+    parser.add_argument("--stats", action="store_true",
+                        help="Instrument LJM calls so the 'stats' command can report them")
+    parser.add_argument("--index", action="store_true",
+                        help="Keep a persistent SD listing index (~/.t7sd/index) for instant completion")
     args = parser.parse_args()
 
     
@@ -42,7 +48,12 @@ def main():
     register_user_ram_commands(registry)
     register_system_commands(registry)
 
-    dev = LabJackSD.connect(identifier=args.identifier)
+    # The pool health-checks the session's connection between commands and
+    # reconnects it in place (with backoff) if the link dropped
+    pool = DevicePool(
+        backend=args.backend, instrument=args.stats, index=args.index, schedule=True
+    )
+    dev = pool.acquire(args.identifier)
 
     # Load SD cache
     sd_cache = SDCache(dev)
@@ -56,18 +67,24 @@ def main():
         readline.set_completer(completer.complete)
         readline.parse_and_bind("tab: complete")
 
-    dev = LabJackSD.connect(identifier=args.identifier)
-
     while True:
         try:
             line = input("t7sd> ").strip()
+            sd_cache.touch()
+            if line:
+                pool.check(dev)
             registry.dispatch(dev, line)
         except SystemExit:
             break
         except Exception as e:
             print("Error:", e)
+        finally:
+            # Idle time (for background prefetch) counts from the end of a command
+            sd_cache.touch()
 
-    dev.close()
+    sd_cache.close()
+    pool.release(dev)
+    pool.close_all()
 
 
 if __name__ == "__main__":